@@ -0,0 +1,362 @@
+"""End-to-end throughput benchmark: API ingest and worker drain against the fake platform.
+
+Starts the API (uvicorn) and the mock platform as subprocesses, then for every combination of
+``--batch-sizes`` and ``--concurrency``:
+
+1. creates a throwaway entity with ``--accounts`` FAKE accounts through the API,
+2. loads ``--posts`` posts through ``POST /api/v1/posts`` (ingest req/s and request latency),
+3. runs ``run_worker`` in-process until every post is published (drain time, posts/s and the
+   worker's claim-to-commit latency), then deletes the run's rows.
+
+Needs a migrated local Postgres that holds no other pending posts, since the worker would drain those
+too. The JSON report can be passed back as ``--baseline`` to fail on regressions:
+
+    make bench args="--posts 5000 --batch-sizes 20,100 --concurrency 10,50"
+    make bench args="--baseline bench/results/main.json"
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from sqlalchemy import delete, func, or_, select
+
+from social.config import get_settings
+from social.core.enums import Platform, PostStatus
+from social.core.metrics import LatencyStats
+from social.db.models import Account, Entity, Post
+from social.db.session import async_session, engine
+from social.worker import run_worker
+
+logger = logging.getLogger("social.bench")
+
+# Regressions are judged on these (higher-is-better metric, key path into a run)
+COMPARED = [
+    (True, ("ingest", "requests_per_second")),
+    (True, ("drain", "posts_per_second")),
+    (False, ("drain", "claim_to_commit", "posted", "p95")),
+    (False, ("drain", "claim_to_commit", "posted", "p99")),
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _spawn(args: list[str], env: dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], env=env)
+
+
+async def _wait_http(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+            await asyncio.sleep(0.2)
+
+
+def _pending_clause():
+    return or_(
+        Post.status.in_([PostStatus.QUEUED, PostStatus.SCHEDULED, PostStatus.POSTING]),
+        (Post.status == PostStatus.FAILED) & Post.next_retry_at.is_not(None),
+    )
+
+
+async def _pending_posts() -> int:
+    stmt = select(func.count()).select_from(Post).where(_pending_clause())
+    async with async_session() as db:
+        return (await db.execute(stmt)).scalar_one()
+
+
+async def _setup(api: httpx.AsyncClient, accounts: int) -> tuple[uuid.UUID, list[uuid.UUID]]:
+    slug = f"bench-{uuid.uuid4().hex[:12]}"
+    resp = await api.post("/api/v1/entities", json={"slug": slug, "type": "project", "name": slug})
+    resp.raise_for_status()
+    entity_id = uuid.UUID(resp.json()["id"])
+    account_ids = []
+    for i in range(accounts):
+        body = {
+            "entity_id": str(entity_id),
+            "platform": Platform.FAKE,
+            "handle": f"{slug}-{i}",
+            "credentials": {"token": f"{slug}-{i}"},
+        }
+        resp = await api.post("/api/v1/accounts", json=body)
+        resp.raise_for_status()
+        account_ids.append(uuid.UUID(resp.json()["id"]))
+    return entity_id, account_ids
+
+
+async def _teardown(entity_id: uuid.UUID) -> None:
+    async with async_session() as db:
+        await db.execute(delete(Post).where(Post.entity_id == entity_id))
+        await db.execute(delete(Account).where(Account.entity_id == entity_id))
+        await db.execute(delete(Entity).where(Entity.id == entity_id))
+        await db.commit()
+
+
+async def _ingest(
+    api: httpx.AsyncClient, entity_id: uuid.UUID, account_ids: list[uuid.UUID], posts: int, concurrency: int
+) -> dict:
+    latency = LatencyStats()
+    errors = 0
+    counter = iter(range(posts))
+
+    async def client() -> None:
+        nonlocal errors
+        for i in counter:
+            body = {
+                "entity_id": str(entity_id),
+                "account_id": str(account_ids[i % len(account_ids)]),
+                "platform": Platform.FAKE,
+                "content": f"bench post {i} {uuid.uuid4().hex}",
+            }
+            started = time.perf_counter()
+            resp = await api.post("/api/v1/posts", json=body)
+            latency.record("request", time.perf_counter() - started)
+            if resp.status_code != 201:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "posts": posts,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(posts / elapsed, 1),
+        "latency": latency.snapshot().get("request", {}),
+    }
+
+
+async def _drain(entity_id: uuid.UUID, batch_size: int, concurrency: int, timeout: float) -> dict:
+    os.environ["WORKER_BATCH_SIZE"] = str(batch_size)
+    os.environ["WORKER_CONCURRENCY"] = str(concurrency)
+    get_settings.cache_clear()
+
+    pending = select(func.count()).select_from(Post).where(Post.entity_id == entity_id, _pending_clause())
+    shutdown = asyncio.Event()
+    started = time.perf_counter()
+    worker = asyncio.create_task(run_worker(shutdown=shutdown))
+    timed_out = False
+    while True:
+        await asyncio.sleep(0.1)
+        if worker.done():
+            break
+        async with async_session() as db:
+            if (await db.execute(pending)).scalar_one() == 0:
+                break
+        if time.perf_counter() - started > timeout:
+            timed_out = True
+            break
+    elapsed = time.perf_counter() - started
+    shutdown.set()
+    report = await worker
+
+    async with async_session() as db:
+        rows = await db.execute(
+            select(Post.status, func.count()).where(Post.entity_id == entity_id).group_by(Post.status)
+        )
+        statuses = {str(status): count for status, count in rows.all()}
+    posted = statuses.get(PostStatus.POSTED, 0)
+    return {
+        "seconds": round(elapsed, 3),
+        "timed_out": timed_out,
+        "posts_per_second": round(posted / elapsed, 1),
+        "statuses": statuses,
+        "claim_to_commit": report["claim_to_commit"],
+        "queue_wait": report["queue_wait"],
+    }
+
+
+def _lookup(run: dict, path: tuple[str, ...]) -> float | None:
+    for key in path:
+        if not isinstance(run, dict) or key not in run:
+            return None
+        run = run[key]
+    return run if isinstance(run, (int, float)) else None
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Regressions beyond ``max_regression`` (a fraction) against runs with the same settings."""
+    previous = {(r["worker_batch_size"], r["worker_concurrency"]): r for r in baseline.get("runs", [])}
+    failures = []
+    for run in report["runs"]:
+        key = (run["worker_batch_size"], run["worker_concurrency"])
+        before = previous.get(key)
+        if before is None:
+            continue
+        for higher_is_better, path in COMPARED:
+            old, new = _lookup(before, path), _lookup(run, path)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > max_regression:
+                failures.append(f"batch={key[0]} concurrency={key[1]} {'.'.join(path)}: {old} -> {new} ({change:+.0%})")
+    return failures
+
+
+async def bench(args: argparse.Namespace) -> dict:
+    api_port, mock_port = _free_port(), _free_port()
+    env = {**os.environ, "LOG_LEVEL": "WARNING"}
+    mock_url = f"http://127.0.0.1:{mock_port}"
+    os.environ.update(
+        FAKE_PLATFORM_URL=mock_url,
+        ENGAGEMENT_REFRESH="false",
+        WORKER_SHADOW="false",
+        WORKER_METRICS_INTERVAL="1e9",
+        WORKER_POLL_INTERVAL="1.0",
+    )
+    get_settings.cache_clear()
+    settings = get_settings()
+
+    mock = _spawn(
+        [
+            "-m",
+            "social.platforms.mock_server",
+            "--port",
+            str(mock_port),
+            "--latency",
+            args.latency,
+            "--error-rate",
+            str(args.error_rate),
+            "--rate-limit",
+            "0",
+            "--duplicate-window",
+            "0",
+        ],
+        env,
+    )
+    server = _spawn(["-m", "uvicorn", "social.main:app", "--port", str(api_port), "--log-level", "warning"], env)
+    runs = []
+    try:
+        await _wait_http(f"{mock_url}/_stats")
+        await _wait_http(f"http://127.0.0.1:{api_port}/api/v1/health")
+        pending = await _pending_posts()
+        if pending and not args.force:
+            raise SystemExit(f"{pending} posts are already pending in this database; use an empty one or --force")
+
+        headers = {"Authorization": f"Bearer {settings.admin_token}"}
+        limits = httpx.Limits(max_connections=args.ingest_concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{api_port}", headers=headers, limits=limits, timeout=60
+        ) as api:
+            for batch_size in args.batch_sizes:
+                for concurrency in args.concurrency:
+                    logger.warning("Run: batch_size=%d concurrency=%d", batch_size, concurrency)
+                    entity_id, account_ids = await _setup(api, args.accounts)
+                    try:
+                        ingest = await _ingest(api, entity_id, account_ids, args.posts, args.ingest_concurrency)
+                        drain = await _drain(entity_id, batch_size, concurrency, args.timeout)
+                    finally:
+                        if not args.keep:
+                            await _teardown(entity_id)
+                    runs.append(
+                        {
+                            "worker_batch_size": batch_size,
+                            "worker_concurrency": concurrency,
+                            "ingest": ingest,
+                            "drain": drain,
+                        }
+                    )
+                    logger.warning(
+                        "  ingest %.1f req/s, drain %.1f posts/s in %.1fs",
+                        ingest["requests_per_second"],
+                        drain["posts_per_second"],
+                        drain["seconds"],
+                    )
+    finally:
+        for proc in (server, mock):
+            proc.terminate()
+        for proc in (server, mock):
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        await engine.dispose()
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "host": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "config": {
+            "posts": args.posts,
+            "accounts": args.accounts,
+            "ingest_concurrency": args.ingest_concurrency,
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+            "worker_prefetch": settings.worker_prefetch,
+            "worker_result_batch_size": settings.worker_result_batch_size,
+        },
+        "runs": runs,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--batch-sizes", type=_ints, default=[20, 100])
+    parser.add_argument("--concurrency", type=_ints, default=[10, 50])
+    parser.add_argument("--ingest-concurrency", type=int, default=32)
+    parser.add_argument("--latency", default="lognormal:80,0.5", help="mock platform latency, see mock_server")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=600.0, help="seconds allowed per drain")
+    parser.add_argument("--output", type=Path, default=None, help="default bench/results/<timestamp>.json")
+    parser.add_argument("--baseline", type=Path, default=None, help="earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument("--force", action="store_true", help="run even if other posts are pending")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark rows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    report = asyncio.run(bench(args))
+
+    output = args.output or Path("bench/results") / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Report written to {output}")
+
+    if args.baseline:
+        failures = compare(report, json.loads(args.baseline.read_text()), args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+        print(f"No regressions beyond {args.max_regression:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
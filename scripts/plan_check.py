@@ -0,0 +1,401 @@
+"""Query-plan regression guard for the hot SQL paths in ``social.services``.
+
+Seeds a realistically skewed dataset (mostly POSTED, a small ready set, a few heavy accounts),
+runs the real service functions to capture the exact SQL they issue, and checks
+``EXPLAIN (ANALYZE, BUFFERS)`` of each statement against three rules:
+
+- no sequential scan over ``posts`` or ``engagement_samples``,
+- no node that underestimates its rows by more than ``--max-misestimate``,
+- shared buffers touched stay within the query's budget, an absolute count scaled to what the
+  query should touch (the ready set, the entities with claimable posts, the rows it writes) and
+  never to the size of ``posts``, so a query that starts walking the whole table fails however
+  large ``--posts`` is.
+
+The claims are then checked again, to the same budgets, after piling ``--failed`` permanently
+failed posts (``next_retry_at IS NULL``) onto the table: they are outside the ready set, so a
+claim that visits them is doing O(table) work.
+
+Everything runs in one transaction that is rolled back, so the database is left as it was. Use a
+migrated local database without much data of its own, since existing rows skew the plans:
+
+    make plan-check
+    make plan-check args="--posts 2000000 --json plans.json"
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from social.config import get_settings
+from social.core.enums import PostStatus
+from social.db.models import CLAIMABLE_POST_WHERE
+from social.db.session import engine
+from social.scheduler import OVERDUE_GRACE
+from social.services.account_service import list_accounts
+from social.services.engagement_service import claim_due_engagement, get_series
+from social.services.post_service import get_post, list_posts
+from social.services.publish_service import claim_ready_posts, renew_leases, upcoming_scheduled
+
+# Relations that must always be reached through an index
+NO_SEQ_SCAN = {"posts", "engagement_samples"}
+# Misestimates below this many actual rows are noise
+MIN_MISESTIMATE_ROWS = 1000
+# Buffers one updated posts row may touch: its heap page plus an entry in every posts index
+ROW_WRITE_BUFFERS = 40
+
+SEED = [
+    """
+    INSERT INTO entities (id, slug, type, name, created_at, updated_at)
+    SELECT gen_random_uuid(), 'plan-check-' || g, 'project', 'plan check ' || g, now(), now()
+    FROM generate_series(1, :entities) g
+    """,
+    """
+    INSERT INTO accounts (
+        id, entity_id, platform, handle, status, rate_limit_remaining, rate_limit_reset, created_at, updated_at
+    )
+    SELECT gen_random_uuid(), e.id, 'twitter', e.slug || '-' || g,
+        CASE WHEN random() < 0.05 THEN 'expired' ELSE 'active' END,
+        CASE WHEN random() < 0.05 THEN 0 END, now() + interval '15 minutes', now(), now()
+    FROM entities e, generate_series(1, :accounts_per_entity) g
+    WHERE e.slug LIKE 'plan-check-%'
+    """,
+    """
+    CREATE TEMPORARY TABLE plan_accounts ON COMMIT DROP AS
+    SELECT a.id, a.entity_id, (row_number() OVER (ORDER BY a.id) - 1)::int AS n
+    FROM accounts a JOIN entities e ON e.id = a.entity_id
+    WHERE e.slug LIKE 'plan-check-%'
+    """,
+    # Account n gets a share of posts falling off like n^(-2/3): a handful of accounts own most rows.
+    # Statuses: 97% posted, 2.2% failed for good, 0.3% failed awaiting retry (half due), 0.2% queued,
+    # 0.2% scheduled (a tenth due), 0.1% posting (a third with lapsed leases). Only posted and
+    # permanently failed posts are old; everything still in flight was created in the last hour.
+    """
+    INSERT INTO posts (
+        id, entity_id, account_id, platform, content, status, scheduled_for, posted_at, platform_post_id,
+        engagement_due_at, priority, retry_count, next_retry_at, lease_owner, lease_expires_at,
+        created_at, updated_at
+    )
+    SELECT gen_random_uuid(), a.entity_id, a.id, 'twitter', 'plan check post ' || s.g, s.status,
+        CASE WHEN s.status = 'scheduled' THEN now() + (random() * 10 - 1) * interval '1 hour' END,
+        CASE WHEN s.status = 'posted' THEN s.created + interval '1 minute' END,
+        CASE WHEN s.status = 'posted' THEN s.g::text END,
+        CASE WHEN s.status = 'posted' AND s.created > now() - interval '7 days'
+            THEN now() + (random() - 0.2) * interval '1 hour' END,
+        CASE WHEN random() < 0.05 THEN 7 ELSE 0 END,
+        CASE WHEN s.retrying THEN 1 WHEN s.status = 'failed' THEN 5 ELSE 0 END,
+        CASE WHEN s.retrying THEN now() + (random() - 0.5) * interval '1 hour' END,
+        CASE WHEN s.status = 'posting' THEN 'plan-check' END,
+        CASE WHEN s.status = 'posting' THEN now() + (random() - 0.33) * interval '6 minutes' END,
+        s.created, s.created
+    FROM (
+        SELECT g, status, retrying,
+            CASE WHEN status IN ('posted', 'failed') AND NOT retrying THEN now() - random() * interval '180 days'
+                ELSE now() - random() * interval '1 hour' END AS created,
+            floor(:accounts * power(random(), 3))::int AS n
+        FROM (
+            SELECT g, r >= 0.9850 AND r < 0.9880 AS retrying,
+                CASE WHEN r < 0.9700 THEN 'posted'
+                    WHEN r < 0.9880 THEN 'failed'
+                    WHEN r < 0.9900 THEN 'queued'
+                    WHEN r < 0.9920 THEN 'scheduled'
+                    WHEN r < 0.9930 THEN 'posting'
+                    ELSE 'failed' END AS status
+            FROM (SELECT g, random() AS r FROM generate_series(1, :posts) g) raw
+        ) statuses
+    ) s
+    JOIN plan_accounts a ON a.n = s.n
+    """,
+    """
+    INSERT INTO engagement_samples (post_id, sampled_at, likes, reposts, replies, views)
+    SELECT p.id, p.posted_at + h * interval '1 hour', h * 3, h, h / 2, h * 100
+    FROM posts p JOIN plan_accounts a ON a.id = p.account_id, generate_series(1, :samples_per_post) h
+    WHERE p.status = 'posted' AND p.posted_at > now() - interval '7 days'
+    """,
+    "ANALYZE entities",
+    "ANALYZE accounts",
+    "ANALYZE posts",
+    "ANALYZE engagement_samples",
+]
+
+# Permanently failed posts, recent like the in-flight ones and half of them with retries left, so
+# only next_retry_at IS NULL keeps them out of the claim.
+FAILED_SEED = [
+    """
+    INSERT INTO posts (
+        id, entity_id, account_id, platform, content, status, error, retry_count, created_at, updated_at
+    )
+    SELECT gen_random_uuid(), a.entity_id, a.id, 'twitter', 'plan check failed post ' || s.g, 'failed',
+        'rejected', CASE WHEN random() < 0.5 THEN 1 ELSE 5 END, s.created, s.created
+    FROM (
+        SELECT g, now() - random() * interval '1 hour' AS created, floor(:accounts * power(random(), 3))::int AS n
+        FROM generate_series(1, :failed) g
+    ) s
+    JOIN plan_accounts a ON a.n = s.n
+    """,
+    "ANALYZE posts",
+]
+
+
+@dataclass
+class Context:
+    account_id: uuid.UUID
+    entity_id: uuid.UUID
+    post_id: uuid.UUID
+    posting_ids: list[uuid.UUID]
+    # Posts in the claim's partial indexes, and the entities they belong to
+    ready: int = 0
+    ready_entities: int = 0
+
+
+@dataclass
+class Check:
+    name: str
+    run: Callable[[AsyncSession, Context], Awaitable[Any]]
+    # Shared buffers allowed
+    budget: Callable[[Context], int]
+    settings: dict = field(default_factory=dict)
+
+
+def _claim_budget(ctx: Context) -> int:
+    # A few buffers per ready post and per entity probed, plus writing the 20 claimed rows.
+    return 2 * ctx.ready + 4 * ctx.ready_entities + 20 * ROW_WRITE_BUFFERS
+
+
+CHECKS = [
+    Check("claim_ready_posts", lambda db, ctx: claim_ready_posts(db, 20, lease_owner="plan-check"), _claim_budget),
+    Check(
+        "claim_ready_posts[fifo]",
+        lambda db, ctx: claim_ready_posts(db, 20, lease_owner="plan-check"),
+        _claim_budget,
+        {"worker_fair_claims": False},
+    ),
+    Check(
+        "claim_ready_posts[shard]",
+        lambda db, ctx: claim_ready_posts(db, 20, lease_owner="plan-check", shard=(0, 4)),
+        _claim_budget,
+    ),
+    Check(
+        "claim_ready_posts[high]",
+        lambda db, ctx: claim_ready_posts(db, 20, lease_owner="plan-check", min_priority=5),
+        _claim_budget,
+    ),
+    Check(
+        "upcoming_scheduled",
+        lambda db, ctx: upcoming_scheduled(
+            db, datetime.now(timezone.utc) - OVERDUE_GRACE, datetime.now(timezone.utc) + timedelta(minutes=5)
+        ),
+        lambda ctx: ctx.ready // 2 + 100,
+    ),
+    Check(
+        "claim_due_engagement",
+        lambda db, ctx: claim_due_engagement(db, 1000),
+        lambda ctx: 1000 * (ROW_WRITE_BUFFERS + 5),
+    ),
+    Check(
+        "renew_leases",
+        lambda db, ctx: renew_leases(db, "plan-check", ctx.posting_ids),
+        lambda ctx: len(ctx.posting_ids) * ROW_WRITE_BUFFERS + 50,
+    ),
+    Check("list_posts[account]", lambda db, ctx: list_posts(db, account_id=ctx.account_id), lambda ctx: 1000),
+    Check(
+        "list_posts[entity,queued]",
+        lambda db, ctx: list_posts(db, entity_id=ctx.entity_id, status=PostStatus.QUEUED),
+        lambda ctx: ctx.ready // 4 + 200,
+    ),
+    Check("list_accounts[entity]", lambda db, ctx: list_accounts(db, entity_id=ctx.entity_id), lambda ctx: 200),
+    Check("get_post", lambda db, ctx: get_post(db, ctx.post_id), lambda ctx: 20),
+    Check("get_series", lambda db, ctx: get_series(db, ctx.post_id), lambda ctx: 50),
+]
+
+
+
+async def seed(conn: AsyncConnection, args: argparse.Namespace) -> Context:
+    params = {
+        "entities": args.entities,
+        "accounts_per_entity": args.accounts_per_entity,
+        "accounts": args.entities * args.accounts_per_entity,
+        "posts": args.posts,
+        "samples_per_post": args.samples_per_post,
+    }
+    for sql in SEED:
+        await conn.execute(text(sql), params)
+
+    account_id, entity_id = (await conn.execute(text("SELECT id, entity_id FROM plan_accounts WHERE n = 0"))).one()
+    post_id = (
+        await conn.execute(
+            text(
+                "SELECT id FROM posts WHERE account_id = :account_id AND status = 'posted' "
+                "AND posted_at > now() - interval '7 days' LIMIT 1"
+            ),
+            {"account_id": account_id},
+        )
+    ).scalar_one()
+    posting_ids = await conn.execute(text("SELECT id FROM posts WHERE lease_owner = 'plan-check' LIMIT 50"))
+    ready, ready_entities = (
+        await conn.execute(text(f"SELECT count(*), count(DISTINCT entity_id) FROM posts WHERE {CLAIMABLE_POST_WHERE}"))
+    ).one()
+    return Context(account_id, entity_id, post_id, list(posting_ids.scalars()), ready, ready_entities)
+
+
+async def capture(conn: AsyncConnection, check: Check, ctx: Context) -> list[tuple[str, Any]]:
+    """Run the check's service call and return the statements it sent, then undo its effects."""
+    statements: list[tuple[str, Any]] = []
+
+    def record(_conn, _cursor, statement, parameters, _context, _executemany):
+        if not statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE", "ROLLBACK")):
+            statements.append((statement, parameters))
+
+    settings = get_settings()
+    saved = {name: getattr(settings, name) for name in check.settings}
+    for name, value in check.settings.items():
+        setattr(settings, name, value)
+    event.listen(conn.sync_connection, "before_cursor_execute", record)
+    try:
+        async with AsyncSession(bind=conn, join_transaction_mode="create_savepoint") as db:
+            await check.run(db, ctx)
+            await db.rollback()
+    finally:
+        event.remove(conn.sync_connection, "before_cursor_execute", record)
+        for name, value in saved.items():
+            setattr(settings, name, value)
+    return statements
+
+
+async def explain(conn: AsyncConnection, statement: str, parameters: Any) -> dict:
+    savepoint = await conn.begin_nested()
+    try:
+        result = await conn.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters)
+        plan = result.scalar_one()
+    finally:
+        await savepoint.rollback()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]
+
+
+def _nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _nodes(child)
+
+
+def evaluate(plan: dict, limit: int, max_misestimate: float) -> tuple[dict, list[str]]:
+    root = plan["Plan"]
+    buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+    problems = []
+    if buffers > limit:
+        problems.append(f"{buffers} shared buffers > budget {limit}")
+
+    worst = 1.0
+    for node in _nodes(root):
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in NO_SEQ_SCAN:
+            problems.append(f"Seq Scan on {node['Relation Name']}")
+        loops = max(node.get("Actual Loops", 1), 1)
+        actual = node.get("Actual Rows", 0) * loops
+        estimated = max(node.get("Plan Rows", 0) * loops, 1)
+        # Only underestimates: nodes under a LIMIT legitimately stop well short of their estimate.
+        if actual < MIN_MISESTIMATE_ROWS:
+            continue
+        worst = max(worst, actual / estimated)
+        if actual / estimated > max_misestimate:
+            problems.append(
+                f"{node['Node Type']}{' on ' + node['Relation Name'] if 'Relation Name' in node else ''} "
+                f"estimated {estimated} rows, got {actual}"
+            )
+    summary = {
+        "buffers": buffers,
+        "budget": limit,
+        "worst_underestimate": round(worst, 1),
+        "execution_ms": round(plan.get("Execution Time", 0.0), 2),
+        "scans": sorted(
+            {
+                f"{node['Node Type']}:{node.get('Index Name') or node.get('Relation Name')}"
+                for node in _nodes(root)
+                if "Relation Name" in node or "Index Name" in node
+            }
+        ),
+    }
+    return summary, problems
+
+
+async def run_checks(
+    conn: AsyncConnection, checks: list[Check], ctx: Context, args: argparse.Namespace, suffix: str = ""
+) -> tuple[list[dict], bool]:
+    results = []
+    ok = True
+    for check in checks:
+        statements = await capture(conn, check, ctx)
+        for i, (statement, parameters) in enumerate(statements):
+            name = (check.name if len(statements) == 1 else f"{check.name}#{i + 1}") + suffix
+            plan = await explain(conn, statement, parameters)
+            summary, problems = evaluate(plan, check.budget(ctx), args.max_misestimate)
+            ok = ok and not problems
+            status = "FAIL" if problems else "ok"
+            print(
+                f"{status:4} {name:36} buffers={summary['buffers']:>7}/{summary['budget']:<7} "
+                f"underestimate={summary['worst_underestimate']:<6} {summary['execution_ms']:>8.2f}ms"
+            )
+            for problem in problems:
+                print(f"       {problem}")
+            if args.verbose:
+                print(f"       {', '.join(summary['scans'])}")
+            results.append({"name": name, **summary, "problems": problems, "sql": statement, "plan": plan})
+    return results, ok
+
+
+async def check_plans(args: argparse.Namespace) -> tuple[list[dict], bool]:
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            await conn.execute(text("SET LOCAL statement_timeout = 0"))
+            print(f"Seeding {args.posts} posts...", flush=True)
+            ctx = await seed(conn, args)
+            print(f"Ready set: {ctx.ready} posts across {ctx.ready_entities} entities")
+            results, ok = await run_checks(conn, CHECKS, ctx, args)
+
+            if args.failed:
+                print(f"Adding {args.failed} permanently failed posts...", flush=True)
+                params = {"accounts": args.entities * args.accounts_per_entity, "failed": args.failed}
+                for sql in FAILED_SEED:
+                    await conn.execute(text(sql), params)
+                claims = [check for check in CHECKS if check.name.startswith("claim_ready_posts")]
+                failed_results, failed_ok = await run_checks(conn, claims, ctx, args, "[+failed]")
+                results += failed_results
+                ok = ok and failed_ok
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+    return results, ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=500_000)
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--accounts-per-entity", type=int, default=5)
+    parser.add_argument("--samples-per-post", type=int, default=12)
+    parser.add_argument("--failed", type=int, default=200_000, help="permanently failed posts added for the re-check")
+    parser.add_argument("--max-misestimate", type=float, default=100.0)
+    parser.add_argument("--json", type=str, default=None, help="write every plan to this file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the scans each plan uses")
+    args = parser.parse_args()
+
+    results, ok = asyncio.run(check_plans(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+    if not ok:
+        print("Query plans regressed", file=sys.stderr)
+        sys.exit(1)
+    print("All query plans within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
 import uuid
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from social.api.deps import Principal, get_principal
 from social.core.enums import Platform
+from social.core.pagination import NEXT_CURSOR_HEADER, next_cursor
 from social.db.deps import get_db
-from social.schemas.accounts import AccountCreate, AccountOut, AccountUpdate
+from social.schemas.accounts import AccountCreate, AccountExpand, AccountOut, AccountUpdate
 from social.services import account_service
 
 router = APIRouter(prefix="/accounts", tags=["accounts"])
@@ -23,23 +24,35 @@ async def create_account(
 
 @router.get("", response_model=list[AccountOut])
 async def list_accounts(
+    response: Response,
     entity_id: uuid.UUID | None = Query(default=None),
     platform: Platform | None = Query(default=None),
     limit: int = Query(default=100, le=1000),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(default=0, ge=0, deprecated=True),
+    cursor: str | None = Query(default=None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header"),
+    expand: list[AccountExpand] = Query(default=[]),
     db: AsyncSession = Depends(get_db),
     _: Principal = Depends(get_principal),
 ):
-    return await account_service.list_accounts(db, entity_id=entity_id, platform=platform, limit=limit, offset=offset)
+    accounts = await account_service.list_accounts(
+        db, entity_id=entity_id, platform=platform, limit=limit, offset=offset, cursor=cursor
+    )
+    await account_service.expand_accounts(db, accounts, expand)
+    if cursor_out := next_cursor(accounts, limit):
+        response.headers[NEXT_CURSOR_HEADER] = cursor_out
+    return accounts
 
 
 @router.get("/{account_id}", response_model=AccountOut)
 async def get_account(
     account_id: uuid.UUID,
+    expand: list[AccountExpand] = Query(default=[]),
     db: AsyncSession = Depends(get_db),
     _: Principal = Depends(get_principal),
 ):
-    return await account_service.get_account(db, account_id)
+    account = await account_service.get_account(db, account_id)
+    await account_service.expand_accounts(db, [account], expand)
+    return account
 
 
 @router.patch("/{account_id}", response_model=AccountOut)
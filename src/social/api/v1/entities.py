@@ -1,12 +1,13 @@
 import uuid
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from social.api.deps import Principal, get_principal
 from social.core.enums import EntityType
+from social.core.pagination import NEXT_CURSOR_HEADER, next_cursor
 from social.db.deps import get_db
-from social.schemas.entities import EntityCreate, EntityOut, EntityUpdate
+from social.schemas.entities import EntityCreate, EntityExpand, EntityOut, EntityUpdate
 from social.services import entity_service
 
 router = APIRouter(prefix="/entities", tags=["entities"])
@@ -23,22 +24,32 @@ async def create_entity(
 
 @router.get("", response_model=list[EntityOut])
 async def list_entities(
+    response: Response,
     type: EntityType | None = Query(default=None),
     limit: int = Query(default=100, le=1000),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(default=0, ge=0, deprecated=True),
+    cursor: str | None = Query(default=None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header"),
+    expand: list[EntityExpand] = Query(default=[]),
     db: AsyncSession = Depends(get_db),
     _: Principal = Depends(get_principal),
 ):
-    return await entity_service.list_entities(db, entity_type=type, limit=limit, offset=offset)
+    entities = await entity_service.list_entities(db, entity_type=type, limit=limit, offset=offset, cursor=cursor)
+    await entity_service.expand_entities(db, entities, expand)
+    if cursor_out := next_cursor(entities, limit):
+        response.headers[NEXT_CURSOR_HEADER] = cursor_out
+    return entities
 
 
 @router.get("/{entity_id}", response_model=EntityOut)
 async def get_entity(
     entity_id: uuid.UUID,
+    expand: list[EntityExpand] = Query(default=[]),
     db: AsyncSession = Depends(get_db),
     _: Principal = Depends(get_principal),
 ):
-    return await entity_service.get_entity(db, entity_id)
+    entity = await entity_service.get_entity(db, entity_id)
+    await entity_service.expand_entities(db, [entity], expand)
+    return entity
 
 
 @router.patch("/{entity_id}", response_model=EntityOut)
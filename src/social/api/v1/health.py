@@ -1,8 +1,16 @@
 from fastapi import APIRouter
 
+from social.core.encryption import credentials_cache_stats
+from social.platforms.registry import adapter_cache_stats
+
 router = APIRouter()
 
 
 @router.get("/health")
 async def health():
-    return {"status": "ok", "service": "social"}
+    # Cache counters are per process; use them to size ADAPTER_CACHE_SIZE and CREDENTIALS_CACHE_SIZE.
+    return {
+        "status": "ok",
+        "service": "social",
+        "caches": {"adapters": adapter_cache_stats(), "credentials": credentials_cache_stats()},
+    }
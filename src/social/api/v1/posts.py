@@ -1,13 +1,16 @@
 import uuid
+from typing import Literal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from social.api.deps import Principal, get_principal
 from social.core.enums import Platform, PostStatus
+from social.core.pagination import NEXT_CURSOR_HEADER, next_cursor
 from social.db.deps import get_db
-from social.schemas.posts import PostCreate, PostOut
-from social.services import post_service
+from social.schemas.posts import EngagementSampleOut, PostBulk, PostBulkOut, PostCreate, PostOut
+from social.services import engagement_service, post_service
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
@@ -21,19 +24,58 @@ async def create_post(
     return await post_service.create_post(db, data)
 
 
+@router.post("/bulk", response_model=PostBulkOut, status_code=201)
+async def create_posts(
+    data: PostBulk,
+    db: AsyncSession = Depends(get_db),
+    _: Principal = Depends(get_principal),
+):
+    created, errors = await post_service.create_posts(db, data.posts)
+    return {"created": created, "errors": errors}
+
+
 @router.get("", response_model=list[PostOut])
 async def list_posts(
+    response: Response,
     entity_id: uuid.UUID | None = Query(default=None),
     account_id: uuid.UUID | None = Query(default=None),
     platform: Platform | None = Query(default=None),
     status: PostStatus | None = Query(default=None),
     limit: int = Query(default=100, le=1000),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(default=0, ge=0, deprecated=True),
+    cursor: str | None = Query(default=None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header"),
     db: AsyncSession = Depends(get_db),
     _: Principal = Depends(get_principal),
 ):
-    return await post_service.list_posts(
-        db, entity_id=entity_id, account_id=account_id, platform=platform, status=status, limit=limit, offset=offset
+    posts = await post_service.list_posts(
+        db,
+        entity_id=entity_id,
+        account_id=account_id,
+        platform=platform,
+        status=status,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+    )
+    if cursor_out := next_cursor(posts, limit):
+        response.headers[NEXT_CURSOR_HEADER] = cursor_out
+    return posts
+
+
+@router.get("/export")
+async def export_posts(
+    format: Literal["ndjson", "csv"] = Query(default="ndjson"),
+    entity_id: uuid.UUID | None = Query(default=None),
+    account_id: uuid.UUID | None = Query(default=None),
+    platform: Platform | None = Query(default=None),
+    status: PostStatus | None = Query(default=None),
+    _: Principal = Depends(get_principal),
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        post_service.export_posts(format, entity_id=entity_id, account_id=account_id, platform=platform, status=status),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="posts.{format}"'},
     )
 
 
@@ -46,6 +88,16 @@ async def get_post(
     return await post_service.get_post(db, post_id)
 
 
+@router.get("/{post_id}/engagement", response_model=list[EngagementSampleOut])
+async def get_engagement_series(
+    post_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    _: Principal = Depends(get_principal),
+):
+    await post_service.get_post(db, post_id)
+    return await engagement_service.get_series(db, post_id)
+
+
 @router.delete("/{post_id}", response_model=PostOut)
 async def cancel_post(
     post_id: uuid.UUID,
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -12,14 +13,80 @@ class Settings(BaseSettings):
     jwt_secret: str = "changeme"
     jwt_algorithm: str = "HS256"
     encryption_key: str = ""
+    # Decrypted account credentials kept in memory; 0 disables the cache
+    credentials_cache_size: int = 4096
+    credentials_cache_ttl: float = 300.0
     log_level: str = "INFO"
     cors_origins: str = "*"
 
-    worker_poll_interval: float = 5.0
+    http_timeout: float = 30.0
+    # Overrides http_timeout for specific hosts, e.g. {"api.twitter.com": 20}
+    http_host_timeouts: dict[str, float] = {}
+    http_max_connections: int = 100
+    http_max_keepalive: int = 20
+    http_keepalive_expiry: float = 30.0
+    # Requires the optional h2 dependency (pip install social[http2])
+    http_http2: bool = False
+
+    # Live platform adapters (sessions, headers) kept per process, keyed by account
+    adapter_cache_size: int = 2048
+
+    # Safety-net claim while idle; notifies, the precision scheduler and this worker's own retry
+    # due times wake it sooner
+    worker_poll_interval: float = 30.0
+    worker_listen: bool = True
     worker_batch_size: int = 20
     worker_concurrency: int = 10
+    worker_prefetch: int = 2
     worker_max_retries: int = 5
     worker_retry_base_delay: float = 30.0
+    worker_retry_max_delay: float = 3600.0
+    # Identifies this worker's leases; defaults to host:pid
+    worker_id: str = ""
+    # A POSTING post whose lease is not renewed within this window is reclaimed by other workers
+    worker_lease_seconds: float = 120.0
+    # Worker processes started by `social-worker`; with sharding each owns a slice of accounts
+    worker_processes: int = 1
+    worker_shard_by_account: bool = True
+    # Seconds the supervisor waits for children to drain before killing them
+    worker_drain_timeout: float = 60.0
+    # SCHEDULED posts due within the lookahead (seconds) are held in memory and claimed on the exact
+    # second; the set is reloaded every refresh interval and on schedule notifications. 0 disables.
+    worker_schedule_lookahead: float = 300.0
+    worker_schedule_refresh: float = 30.0
+    # Publish results are group-committed every flush interval (seconds) or batch size, whichever is first
+    worker_result_batch_size: int = 100
+    worker_result_flush_interval: float = 0.02
+    # Posts with at least this priority form the high lane, which alone may use the reserved slots
+    worker_high_priority: int = 5
+    worker_reserved_concurrency: int = 2
+    # Seconds between per-lane queue-wait reports in the worker log
+    worker_metrics_interval: float = 60.0
+    # Interleave claims across entities (weighted by entity metadata "claim_weight") instead of FIFO
+    worker_fair_claims: bool = True
+    worker_fair_per_platform: bool = False
+    # Optional per-process cap in posts per minute, e.g. {"twitter": 50}
+    worker_platform_rate_limits: dict[str, float] = {}
+    # Dispatch through a Redis ready list / delayed set instead of scanning the posts table
+    worker_redis_queue: bool = False
+    worker_redis_reconcile_interval: float = 60.0
+    # Shadow mode: read real ready posts without claiming them and publish each once to the fake
+    # platform, replaying its retries in memory. Nothing is written to posts and engagement refresh is off.
+    worker_shadow: bool = False
+
+    # Base URL of the mock platform behind Platform.FAKE (python -m social.platforms.mock_server)
+    fake_platform_url: str = "http://127.0.0.1:8099"
+
+    # Engagement refresher run by the worker. Tiers are [max post age, refresh interval] in seconds,
+    # youngest first; posts older than the last tier are no longer refreshed.
+    engagement_refresh: bool = True
+    engagement_tiers: list[tuple[float, float]] = [(3600, 300), (86400, 3600), (604800, 86400)]
+    # Samples older than each age (seconds) are thinned to the last one per "hour" / "day" bucket
+    engagement_rollups: list[tuple[float, Literal["hour", "day"]]] = [(86400, "hour"), (2592000, "day")]
+    engagement_rollup_interval: float = 3600.0
+    engagement_poll_interval: float = 60.0
+    engagement_batch_size: int = 1000
+    engagement_concurrency: int = 4
 
 
 @lru_cache
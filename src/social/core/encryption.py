@@ -1,17 +1,33 @@
+import hashlib
 import json
+import time
+from collections import OrderedDict
+from functools import lru_cache
 
 from cryptography.fernet import Fernet
 
 from social.config import get_settings
 
 ENCRYPTED_MARKER = "_encrypted"
+# Account.metadata key holding the encrypted, resumable platform login session
+SESSION_METADATA_KEY = "_session"
+
+# Decrypted payloads keyed by sha256 of the ciphertext, least recently used first. Fernet
+# ciphertexts are unique per encryption, so a new value for an account never hits an old entry.
+_decrypted: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+@lru_cache
+def _fernet_for(key: str) -> Fernet:
+    return Fernet(key.encode())
 
 
 def _get_fernet() -> Fernet | None:
     key = get_settings().encryption_key
     if not key:
         return None
-    return Fernet(key.encode() if isinstance(key, str) else key)
+    return _fernet_for(key)
 
 
 def encrypt_credentials(data: dict) -> dict:
@@ -29,6 +45,38 @@ def decrypt_credentials(data: dict) -> dict:
     f = _get_fernet()
     if f is None:
         return data
+
+    settings = get_settings()
+    digest = _digest(data[ENCRYPTED_MARKER])
+    now = time.monotonic()
+    cached = _decrypted.get(digest)
+    if cached is not None:
+        expires_at, plaintext = cached
+        if expires_at > now:
+            _decrypted.move_to_end(digest)
+            _stats["hits"] += 1
+            return dict(plaintext)
+        del _decrypted[digest]
+
+    _stats["misses"] += 1
     ciphertext = data[ENCRYPTED_MARKER].encode()
-    plaintext = f.decrypt(ciphertext)
-    return json.loads(plaintext)
+    decrypted = json.loads(f.decrypt(ciphertext))
+    if settings.credentials_cache_size > 0:
+        _decrypted[digest] = (now + settings.credentials_cache_ttl, decrypted)
+        while len(_decrypted) > settings.credentials_cache_size:
+            _decrypted.popitem(last=False)
+            _stats["evictions"] += 1
+    return dict(decrypted)
+
+
+def forget_credentials(data: dict | None) -> None:
+    if data and ENCRYPTED_MARKER in data:
+        _decrypted.pop(_digest(data[ENCRYPTED_MARKER]), None)
+
+
+def credentials_cache_stats() -> dict:
+    return {**_stats, "size": len(_decrypted), "max_size": get_settings().credentials_cache_size}
+
+
+def _digest(ciphertext: str) -> str:
+    return hashlib.sha256(ciphertext.encode()).hexdigest()
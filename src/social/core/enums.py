@@ -8,6 +8,8 @@ class Platform(StrEnum):
     FACEBOOK = "facebook"
     INSTAGRAM = "instagram"
     THREADS = "threads"
+    # Local mock platform (social.platforms.mock_server) for load tests and shadow runs
+    FAKE = "fake"
 
 
 class EntityType(StrEnum):
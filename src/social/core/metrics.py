@@ -0,0 +1,42 @@
+import math
+from collections import defaultdict
+
+# Samples kept per lane between reports; percentiles are computed over this window.
+MAX_SAMPLES = 10_000
+
+
+class LatencyStats:
+    """Per-lane latency samples in seconds, summarised and cleared on each ``snapshot()``."""
+
+    def __init__(self) -> None:
+        self._samples: defaultdict[str, list[float]] = defaultdict(list)
+        self._counts: defaultdict[str, int] = defaultdict(int)
+
+    def record(self, lane: str, seconds: float) -> None:
+        self._counts[lane] += 1
+        samples = self._samples[lane]
+        if len(samples) < MAX_SAMPLES:
+            samples.append(max(seconds, 0.0))
+
+    def snapshot(self, reset: bool = True) -> dict[str, dict]:
+        report = {}
+        for lane, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            report[lane] = {
+                "count": self._counts[lane],
+                "avg": round(sum(ordered) / len(ordered), 3),
+                "p50": round(_percentile(ordered, 0.50), 3),
+                "p95": round(_percentile(ordered, 0.95), 3),
+                "p99": round(_percentile(ordered, 0.99), 3),
+                "max": round(ordered[-1], 3),
+            }
+        if reset:
+            self._samples.clear()
+            self._counts.clear()
+        return report
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
@@ -0,0 +1,43 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Select, tuple_
+
+from social.core.exceptions import BadRequest
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, id: uuid.UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (ValueError, TypeError):
+        raise BadRequest("Invalid cursor") from None
+
+
+def paginate(q: Select, model, limit: int, offset: int = 0, cursor: str | None = None) -> Select:
+    # Newest first on (created_at, id); the id tiebreak makes the order total so keyset pages
+    # never skip or repeat rows that share a timestamp.
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        q = q.where(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+    q = q.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+    if offset:
+        q = q.offset(offset)
+    return q
+
+
+def next_cursor(items: list, limit: int) -> str | None:
+    if len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -0,0 +1,65 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from social.config import get_settings
+from social.core.enums import Platform
+from social.platforms.base import RateLimit
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take one token; returns 0 on success, otherwise seconds until a token is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Decides whether a post may hit its platform now, or when it should be retried instead.
+
+    Account budgets come from the platform's own rate-limit headers (mirrored to the accounts
+    table so every worker's claim skips exhausted accounts); platform buckets are an optional
+    per-process cap configured in ``worker_platform_rate_limits``.
+    """
+
+    def __init__(self, platform_limits: dict[str, float]):
+        self._buckets = {Platform(p): TokenBucket(per_min / 60.0, per_min) for p, per_min in platform_limits.items()}
+        self._exhausted: dict[uuid.UUID, datetime] = {}
+
+    def acquire(self, platform: Platform, account_id: uuid.UUID) -> datetime | None:
+        now = datetime.now(timezone.utc)
+        reset_at = self._exhausted.get(account_id)
+        if reset_at is not None:
+            if reset_at > now:
+                return reset_at
+            del self._exhausted[account_id]
+
+        bucket = self._buckets.get(platform)
+        if bucket is not None:
+            wait = bucket.take()
+            if wait > 0:
+                return now + timedelta(seconds=wait)
+        return None
+
+    def record(self, account_id: uuid.UUID, rate_limit: RateLimit) -> None:
+        if rate_limit.exhausted:
+            self._exhausted[account_id] = rate_limit.reset_at
+        else:
+            self._exhausted.pop(account_id, None)
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter:
+    return RateLimiter(get_settings().worker_platform_rate_limits)
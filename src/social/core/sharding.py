@@ -0,0 +1,25 @@
+import uuid
+
+from sqlalchemy import ColumnElement, func
+
+from social.config import get_settings
+
+# Posts are partitioned by the last two bytes of their account id, computed identically in Python
+# (for Redis staging) and in SQL (for claims). Posts without an account all land on shard 0.
+
+
+def configured_shards() -> int:
+    settings = get_settings()
+    return settings.worker_processes if settings.worker_shard_by_account else 1
+
+
+def account_shard(account_id: uuid.UUID | None, shards: int) -> int:
+    if account_id is None or shards <= 1:
+        return 0
+    return int.from_bytes(account_id.bytes[14:16]) % shards
+
+
+def shard_clause(account_id: ColumnElement, shard: int, shards: int) -> ColumnElement[bool]:
+    raw = func.uuid_send(account_id)
+    bucket = func.coalesce(func.get_byte(raw, 14) * 256 + func.get_byte(raw, 15), 0)
+    return bucket % shards == shard
@@ -11,6 +11,7 @@ from social.db.base import Base, SoftDeleteMixin, TimestampMixin, new_uuid
 
 class Entity(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "entities"
+    __table_args__ = (Index("ix_entities_created_id", "created_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=new_uuid)
     slug: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
@@ -18,12 +19,16 @@ class Entity(Base, TimestampMixin, SoftDeleteMixin):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     metadata_: Mapped[dict | None] = mapped_column("metadata", JSONB, nullable=True, default=None)
 
-    accounts: Mapped[list["Account"]] = relationship(back_populates="entity", lazy="selectin")
+    # Never loaded implicitly; use the API's ?expand= options or an explicit loader option.
+    accounts: Mapped[list["Account"]] = relationship(back_populates="entity", lazy="raise")
 
 
 class Account(Base, TimestampMixin):
     __tablename__ = "accounts"
-    __table_args__ = (Index("ix_accounts_entity_platform", "entity_id", "platform"),)
+    __table_args__ = (
+        Index("ix_accounts_entity_platform", "entity_id", "platform"),
+        Index("ix_accounts_created_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=new_uuid)
     entity_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("entities.id"), nullable=False)
@@ -37,7 +42,13 @@ class Account(Base, TimestampMixin):
     metadata_: Mapped[dict | None] = mapped_column("metadata", JSONB, nullable=True, default=None)
 
     entity: Mapped["Entity"] = relationship(back_populates="accounts")
-    posts: Mapped[list["Post"]] = relationship(back_populates="account", lazy="selectin")
+    posts: Mapped[list["Post"]] = relationship(back_populates="account", lazy="raise", passive_deletes=True)
+
+
+# Rows that may still be claimed; FAILED rows without a next_retry_at are permanent failures.
+CLAIMABLE_POST_WHERE = (
+    "status IN ('queued', 'scheduled', 'posting') OR (status = 'failed' AND next_retry_at IS NOT NULL)"
+)
 
 
 class Post(Base, TimestampMixin):
@@ -46,12 +57,35 @@ class Post(Base, TimestampMixin):
         Index("ix_posts_entity_status", "entity_id", "status"),
         Index("ix_posts_account_status", "account_id", "status"),
         Index("ix_posts_status_scheduled", "status", "scheduled_for"),
+        Index("ix_posts_status_priority", "status", text("priority DESC"), "created_at"),
+        Index("ix_posts_created_id", "created_at", "id"),
+        Index("ix_posts_entity_created_id", "entity_id", "created_at", "id"),
+        Index("ix_posts_account_created_id", "account_id", "created_at", "id"),
         Index(
             "ix_posts_failed_retry",
             "status",
             "next_retry_at",
             postgresql_where=text("status = 'failed'"),
         ),
+        Index(
+            "ix_posts_engagement_due",
+            "engagement_due_at",
+            postgresql_where=text("engagement_due_at IS NOT NULL"),
+        ),
+        # Entities with claimable posts and each one's claim order, for the fair claim; partial, so it
+        # stays small however many posts are published.
+        Index(
+            "ix_posts_entity_claim",
+            "entity_id",
+            text("priority DESC"),
+            "created_at",
+            postgresql_where=text(CLAIMABLE_POST_WHERE),
+        ),
+        Index(
+            "ix_posts_posting_lease",
+            "lease_expires_at",
+            postgresql_where=text("status = 'posting'"),
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=new_uuid)
@@ -67,8 +101,30 @@ class Post(Base, TimestampMixin):
     posted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
     engagement: Mapped[dict | None] = mapped_column(JSONB, nullable=True, default=None)
+    # Next engagement refresh for a published post; NULL once it is no longer tracked.
+    engagement_due_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     source: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    priority: Mapped[int] = mapped_column(nullable=False, default=0, server_default=text("0"))
     retry_count: Mapped[int] = mapped_column(nullable=False, default=0)
     next_retry_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    lease_owner: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     account: Mapped["Account | None"] = relationship(back_populates="posts")
+
+
+class EngagementSample(Base):
+    """One engagement reading for a published post; older readings are thinned by the rollup."""
+
+    __tablename__ = "engagement_samples"
+    __table_args__ = (Index("ix_engagement_samples_sampled_at", "sampled_at"),)
+
+    post_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True
+    )
+    sampled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    likes: Mapped[int] = mapped_column(nullable=False, default=0)
+    reposts: Mapped[int] = mapped_column(nullable=False, default=0)
+    replies: Mapped[int] = mapped_column(nullable=False, default=0)
+    views: Mapped[int] = mapped_column(nullable=False, default=0)
+    extra: Mapped[dict | None] = mapped_column(JSONB, nullable=True, default=None)
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from social.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+POSTS_CHANNEL = "social_posts"
+# Payload for changes to scheduled posts: refreshes worker schedules instead of waking a claim.
+SCHEDULE_PAYLOAD = "schedule"
+# A failed LISTEN connect is retried after 1s, doubling up to the max, so a database outage doesn't
+# turn every dispatcher pass into a blocking connect attempt.
+LISTEN_CONNECT_TIMEOUT = 5.0
+LISTEN_MAX_BACKOFF = 60.0
+
+
+async def notify_posts(db: AsyncSession, payload: str = "") -> None:
+    # pg_notify is transactional: listeners only hear about the post once the
+    # surrounding transaction commits, so workers never wake for invisible rows.
+    await db.execute(select(func.pg_notify(POSTS_CHANNEL, payload)))
+
+
+def _asyncpg_dsn(database_url: str) -> str:
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class PostListener:
+    """Holds a dedicated LISTEN connection and sets ``wake`` on every notification.
+
+    ``SCHEDULE_PAYLOAD`` notifications call ``on_schedule`` instead, when given.
+    """
+
+    def __init__(
+        self,
+        wake: asyncio.Event,
+        channel: str = POSTS_CHANNEL,
+        on_schedule: Callable[[], None] | None = None,
+    ):
+        self.wake = wake
+        self.channel = channel
+        self.on_schedule = on_schedule
+        self._conn: asyncpg.Connection | None = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def start(self) -> None:
+        if self.connected or time.monotonic() < self._retry_at:
+            return
+        try:
+            self._conn = await asyncpg.connect(
+                _asyncpg_dsn(get_settings().database_url), timeout=LISTEN_CONNECT_TIMEOUT
+            )
+            self._conn.add_termination_listener(self._on_terminate)
+            await self._conn.add_listener(self.channel, self._on_notify)
+            logger.info("Listening on channel %s", self.channel)
+        except Exception as e:
+            delay = min(LISTEN_MAX_BACKOFF, 2.0**self._failures)
+            self._failures += 1
+            self._retry_at = time.monotonic() + delay
+            if self._failures == 1:
+                logger.warning("Could not start LISTEN on %s, relying on polling", self.channel, exc_info=True)
+            else:
+                logger.warning("LISTEN on %s still unavailable (%s), retrying in %.0fs", self.channel, e, delay)
+            await self.close()
+            return
+        self._failures = 0
+        # Anything queued while we were disconnected was not announced.
+        self.wake.set()
+        if self.on_schedule is not None:
+            self.on_schedule()
+
+    async def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            try:
+                await conn.close(timeout=5)
+            except Exception:
+                conn.terminate()
+
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        if payload == SCHEDULE_PAYLOAD:
+            if self.on_schedule is not None:
+                self.on_schedule()
+            return
+        self.wake.set()
+
+    def _on_terminate(self, conn) -> None:
+        logger.warning("LISTEN connection lost, will reconnect")
+        self._conn = None
@@ -6,6 +6,10 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from social.api.router import api_router
 from social.config import get_settings
+from social.core.pagination import NEXT_CURSOR_HEADER
+from social.platforms.http import close_http_pool, open_http_pool
+from social.platforms.registry import close_adapters
+from social.services.ready_queue import close_redis
 
 
 @asynccontextmanager
@@ -13,7 +17,11 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
     logging.basicConfig(level=getattr(logging, settings.log_level.upper(), logging.INFO))
     logging.getLogger("social").info("Social service starting")
+    await open_http_pool()
     yield
+    await close_adapters()
+    await close_http_pool()
+    await close_redis()
     logging.getLogger("social").info("Social service shutting down")
 
 
@@ -31,6 +39,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(api_router)
@@ -1,8 +1,14 @@
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 
 from social.core.enums import Platform
 
+# Used when a platform answers 429 without telling us when the window resets.
+DEFAULT_RATE_LIMIT_WAIT = 60.0
+
 
 @dataclass
 class PostResult:
@@ -20,8 +26,106 @@ class Engagement:
     extra: dict = field(default_factory=dict)
 
 
+@dataclass
+class RateLimit:
+    remaining: int | None = None
+    reset_at: datetime | None = None
+
+    @property
+    def exhausted(self) -> bool:
+        if self.remaining is None or self.remaining > 0 or self.reset_at is None:
+            return False
+        return self.reset_at > datetime.now(timezone.utc)
+
+
+class PlatformError(Exception):
+    """A classified adapter failure. Anything else an adapter raises is treated as retryable."""
+
+
+class RetryableError(PlatformError):
+    """Transient failure (5xx, timeout); ``retry_after`` is the server's hint, if it gave one."""
+
+    def __init__(self, message: str, retry_after: datetime | None = None):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class PermanentError(PlatformError):
+    """The platform rejected the request itself (bad request, forbidden, duplicate); never retried."""
+
+
+class AuthExpired(PlatformError):
+    """Credentials were rejected; the account needs new credentials before it can post again."""
+
+
+class RateLimited(PlatformError):
+    def __init__(self, reset_at: datetime | None = None, message: str = "Rate limited by platform"):
+        self.reset_at = reset_at or datetime.now(timezone.utc) + timedelta(seconds=DEFAULT_RATE_LIMIT_WAIT)
+        super().__init__(f"{message} until {self.reset_at.isoformat()}")
+
+
+def retry_after_from_headers(headers: Mapping[str, str]) -> datetime | None:
+    # Retry-After is either delay-seconds or an HTTP date.
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return datetime.now(timezone.utc) + timedelta(seconds=max(0, int(value)))
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def error_for_status(
+    status_code: int, headers: Mapping[str, str], message: str, reset_at: datetime | None = None
+) -> PlatformError | None:
+    """Map an HTTP error status to a typed error; ``reset_at`` is the platform's rate-limit reset, if known."""
+    if status_code < 400:
+        return None
+    retry_after = retry_after_from_headers(headers)
+    if status_code == 429:
+        return RateLimited(retry_after or reset_at, message)
+    if status_code == 401:
+        return AuthExpired(message)
+    if status_code == 408 or status_code >= 500:
+        return RetryableError(message, retry_after)
+    return PermanentError(message)
+
+
+def rate_limit_from_headers(headers: Mapping[str, str], remaining_key: str, reset_key: str) -> RateLimit | None:
+    # Both Twitter and the Bluesky PDS send the remaining budget and an epoch-seconds reset.
+    remaining = headers.get(remaining_key)
+    reset = headers.get(reset_key)
+    if remaining is None and reset is None:
+        return None
+    try:
+        return RateLimit(
+            remaining=int(remaining) if remaining is not None else None,
+            reset_at=datetime.fromtimestamp(int(reset), tz=timezone.utc) if reset is not None else None,
+        )
+    except ValueError:
+        return None
+
+
 class PlatformAdapter(ABC):
     platform: Platform
+    # Last rate-limit state reported by the platform, refreshed on every API response.
+    rate_limit: RateLimit | None = None
+    # Most post ids get_engagements accepts in one call.
+    engagement_batch_size: int = 1
+
+    def restore_session(self, state: str) -> None:
+        """Hand the adapter a previously exported login session to resume instead of logging in."""
+
+    def take_session_update(self) -> str | None:
+        """Return the session state if it was created or rotated since the last call, else None."""
+        return None
+
+    async def close(self) -> None:
+        """Release per-adapter resources; called when the registry evicts a cached instance."""
 
     @abstractmethod
     async def publish(self, content: str, media_urls: list[str] | None = None, **kwargs) -> PostResult: ...
@@ -32,5 +136,9 @@ class PlatformAdapter(ABC):
     @abstractmethod
     async def get_engagement(self, platform_post_id: str) -> Engagement: ...
 
+    async def get_engagements(self, platform_post_ids: list[str]) -> dict[str, Engagement]:
+        """Engagement for up to ``engagement_batch_size`` posts; ids the platform no longer has are omitted."""
+        return {post_id: await self.get_engagement(post_id) for post_id in platform_post_ids}
+
     @abstractmethod
     async def verify_credentials(self, credentials: dict) -> bool: ...
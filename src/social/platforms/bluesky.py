@@ -1,30 +1,145 @@
+import asyncio
 import logging
+from datetime import datetime, timezone
 
-from atproto import AsyncClient
+from atproto import AsyncClient, SessionEvent
+from atproto_client.exceptions import RequestException
 
 from social.core.enums import Platform
-from social.platforms.base import Engagement, PlatformAdapter, PostResult
+from social.platforms.base import (
+    AuthExpired,
+    Engagement,
+    PlatformAdapter,
+    PostResult,
+    RateLimit,
+    RateLimited,
+    RetryableError,
+    error_for_status,
+    rate_limit_from_headers,
+)
 
 logger = logging.getLogger(__name__)
 
+# app.bsky.feed.getPosts accepts up to 25 URIs per call
+BLUESKY_GET_POSTS_LIMIT = 25
+
+
+class _TrackingClient(AsyncClient):
+    # atproto hides response headers from its high-level methods; every XRPC call goes through
+    # _invoke, so that is where the PDS rate-limit headers can be observed.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limit: RateLimit | None = None
+        # Set when atproto creates or rotates the session, cleared once the caller has persisted it.
+        self.session_changed = False
+        # Set on 401 so the next adapter logs in again instead of reusing a dead session.
+        self.invalid = False
+        self.on_session_change(self._on_session_change)
+
+    def _on_session_change(self, event: SessionEvent, session) -> None:
+        if event != SessionEvent.IMPORT:
+            self.session_changed = True
+
+    async def _invoke(self, invoke_type, **kwargs):
+        try:
+            response = await super()._invoke(invoke_type, **kwargs)
+        except RequestException as e:
+            response = e.response
+            if response is not None:
+                self._track(response.headers)
+                if response.status_code == 401:
+                    self.invalid = True
+                error = error_for_status(
+                    response.status_code,
+                    response.headers,
+                    f"Bluesky {response.status_code}: {_describe(response.content)}",
+                    self.rate_limit.reset_at if self.rate_limit else None,
+                )
+                if error is not None:
+                    raise error from e
+            raise
+        self._track(response.headers)
+        return response
+
+    def _track(self, headers: dict) -> None:
+        rate_limit = rate_limit_from_headers(headers, "ratelimit-remaining", "ratelimit-reset")
+        if rate_limit is not None:
+            self.rate_limit = rate_limit
+
+
+def _describe(content) -> str:
+    # XRPC errors carry {"error": ..., "message": ...}; atproto may have parsed them into a model.
+    error = getattr(content, "error", None) or (content.get("error") if isinstance(content, dict) else None)
+    message = getattr(content, "message", None) or (content.get("message") if isinstance(content, dict) else None)
+    return ": ".join(part for part in (error, message) if part) or "request failed"
+
 
 class BlueskyAdapter(PlatformAdapter):
     platform = Platform.BLUESKY
+    engagement_batch_size = BLUESKY_GET_POSTS_LIMIT
 
     def __init__(self, credentials: dict):
         self.handle = credentials["handle"]
         self.app_password = credentials["app_password"]
-        self._client: AsyncClient | None = None
+        self._client: _TrackingClient | None = None
+        self._saved_session: str | None = None
+        # The registry hands one cached instance to every post for the account, so this lock
+        # is what keeps concurrent posts down to a single createSession.
+        self._login_lock = asyncio.Lock()
+
+    @property
+    def rate_limit(self) -> RateLimit | None:
+        return self._client.rate_limit if self._client is not None else None
 
-    async def _get_client(self) -> AsyncClient:
-        if self._client is None:
-            self._client = AsyncClient()
-            await self._client.login(self.handle, self.app_password)
+    def restore_session(self, state: str) -> None:
+        self._saved_session = state
+
+    def take_session_update(self) -> str | None:
+        client = self._client
+        if client is None or not client.session_changed or client.invalid:
+            return None
+        client.session_changed = False
+        return client.export_session_string()
+
+    async def _get_client(self) -> _TrackingClient:
+        if self._client is not None and not self._client.invalid:
+            return self._client
+
+        async with self._login_lock:
+            if self._client is None or self._client.invalid:
+                self._client = await self._login()
         return self._client
 
+    async def close(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.request.close()
+
+    async def _login(self) -> _TrackingClient:
+        if self._saved_session:
+            client = _TrackingClient()
+            try:
+                await client.login(session_string=self._saved_session)
+                if not client.invalid:
+                    return client
+            except (RateLimited, RetryableError):
+                raise
+            except Exception:
+                logger.info("Stored Bluesky session for %s could not be resumed, logging in", self.handle)
+            self._saved_session = None
+
+        client = _TrackingClient()
+        await client.login(self.handle, self.app_password)
+        return client
+
     async def publish(self, content: str, media_urls: list[str] | None = None, **kwargs) -> PostResult:
+        # An AuthExpired from logging in means the app password itself was rejected.
         client = await self._get_client()
-        resp = await client.send_post(text=content)
+        try:
+            resp = await client.send_post(text=content)
+        except AuthExpired as e:
+            # Only the session died; the client is now marked invalid and the retry logs in again.
+            raise RetryableError("Bluesky session expired", datetime.now(timezone.utc)) from e
         # resp.uri is like at://did:plc:xxx/app.bsky.feed.post/yyy
         parts = resp.uri.split("/")
         rkey = parts[-1]
@@ -51,6 +166,19 @@ class BlueskyAdapter(PlatformAdapter):
             replies=post.reply_count or 0,
         )
 
+    async def get_engagements(self, platform_post_ids: list[str]) -> dict[str, Engagement]:
+        client = await self._get_client()
+        resp = await client.get_posts(platform_post_ids)
+        return {
+            post.uri: Engagement(
+                likes=post.like_count or 0,
+                reposts=post.repost_count or 0,
+                replies=post.reply_count or 0,
+                extra={"quote_count": post.quote_count or 0},
+            )
+            for post in resp.posts
+        }
+
     async def verify_credentials(self, credentials: dict) -> bool:
         try:
             client = AsyncClient()
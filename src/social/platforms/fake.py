@@ -0,0 +1,76 @@
+import logging
+
+import httpx
+
+from social.config import get_settings
+from social.core.enums import Platform
+from social.platforms.base import Engagement, PlatformAdapter, PostResult, error_for_status, rate_limit_from_headers
+from social.platforms.http import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# Mirrors the mock server's GET /posts?ids= limit
+FAKE_LOOKUP_LIMIT = 100
+
+
+class FakeAdapter(PlatformAdapter):
+    """Adapter for the local mock platform; speaks a Twitter-like API against ``fake_platform_url``."""
+
+    platform = Platform.FAKE
+    engagement_batch_size = FAKE_LOOKUP_LIMIT
+
+    def __init__(self, credentials: dict):
+        # Any token is accepted; the mock server keys rate limits and duplicate checks on it.
+        self.token = credentials.get("token", "fake")
+        self._headers = {"Authorization": f"Bearer {self.token}"}
+        self._base_url = get_settings().fake_platform_url.rstrip("/")
+
+    def _check(self, resp: httpx.Response) -> None:
+        rate_limit = rate_limit_from_headers(resp.headers, "x-rate-limit-remaining", "x-rate-limit-reset")
+        if rate_limit is not None:
+            self.rate_limit = rate_limit
+        error = error_for_status(
+            resp.status_code,
+            resp.headers,
+            f"Fake platform {resp.status_code}: {resp.text[:200]}",
+            rate_limit.reset_at if rate_limit else None,
+        )
+        if error is not None:
+            raise error
+
+    async def publish(self, content: str, media_urls: list[str] | None = None, **kwargs) -> PostResult:
+        payload = {"text": content, "media_urls": media_urls or []}
+        resp = await get_http_client(self._base_url).post("/posts", headers=self._headers, json=payload)
+        self._check(resp)
+        data = resp.json()["data"]
+        return PostResult(platform_post_id=data["id"], platform_post_url=data.get("url"), raw_response=data)
+
+    async def delete(self, platform_post_id: str) -> bool:
+        resp = await get_http_client(self._base_url).delete(f"/posts/{platform_post_id}", headers=self._headers)
+        self._check(resp)
+        return resp.json().get("data", {}).get("deleted", False)
+
+    async def get_engagement(self, platform_post_id: str) -> Engagement:
+        resp = await get_http_client(self._base_url).get(f"/posts/{platform_post_id}", headers=self._headers)
+        self._check(resp)
+        return _engagement(resp.json().get("data", {}).get("metrics", {}))
+
+    async def get_engagements(self, platform_post_ids: list[str]) -> dict[str, Engagement]:
+        params = {"ids": ",".join(platform_post_ids)}
+        resp = await get_http_client(self._base_url).get("/posts", headers=self._headers, params=params)
+        self._check(resp)
+        return {post["id"]: _engagement(post.get("metrics", {})) for post in resp.json().get("data", [])}
+
+    async def verify_credentials(self, credentials: dict) -> bool:
+        headers = {"Authorization": f"Bearer {credentials.get('token', self.token)}"}
+        resp = await get_http_client(self._base_url).get("/me", headers=headers, timeout=15)
+        return resp.status_code == 200
+
+
+def _engagement(metrics: dict) -> Engagement:
+    return Engagement(
+        likes=metrics.get("likes", 0),
+        reposts=metrics.get("reposts", 0),
+        replies=metrics.get("replies", 0),
+        views=metrics.get("views", 0),
+    )
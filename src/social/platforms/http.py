@@ -0,0 +1,56 @@
+import logging
+from urllib.parse import urlsplit
+
+import httpx
+
+from social.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# One pooled client per platform base URL, shared by every adapter instance in the process.
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _build_client(base_url: str) -> httpx.AsyncClient:
+    settings = get_settings()
+    host = urlsplit(base_url).hostname or base_url
+    timeout = settings.http_host_timeouts.get(host, settings.http_timeout)
+    return httpx.AsyncClient(
+        base_url=base_url,
+        http2=settings.http_http2,
+        timeout=httpx.Timeout(timeout, connect=min(timeout, 10.0)),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+    )
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    client = _clients.get(base_url)
+    if client is None or client.is_closed:
+        client = _clients[base_url] = _build_client(base_url)
+    return client
+
+
+async def open_http_pool() -> None:
+    # Clients are created lazily on first use; opening just resets any state from a previous run.
+    await close_http_pool()
+    settings = get_settings()
+    logger.info(
+        "HTTP pool ready — max_connections=%d keepalive=%d http2=%s",
+        settings.http_max_connections,
+        settings.http_max_keepalive,
+        settings.http_http2,
+    )
+
+
+async def close_http_pool() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception:
+            logger.warning("Error closing HTTP client for %s", client.base_url, exc_info=True)
@@ -0,0 +1,245 @@
+"""Local mock platform for the FAKE adapter.
+
+Run with ``python -m social.platforms.mock_server`` (or ``make mock-platform``). Every knob can also be
+changed on a running server with ``PATCH /_config``; ``GET /_stats`` reports request counts by outcome.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse
+
+# Matches FAKE_LOOKUP_LIMIT in the adapter
+LOOKUP_LIMIT = 100
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """Parse a latency distribution in milliseconds into a sampler returning seconds.
+
+    ``fixed:MS``, ``uniform:MIN,MAX``, ``normal:MEAN,STDDEV``, ``lognormal:MEDIAN,SIGMA`` or
+    ``exponential:MEAN``; an empty spec means no added latency.
+    """
+    if not spec:
+        return lambda: 0.0
+    kind, _, raw = spec.partition(":")
+    try:
+        args = [float(a) for a in raw.split(",") if a]
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec!r}") from None
+    samplers: dict[str, tuple[int, Callable[..., float]]] = {
+        "fixed": (1, lambda ms: ms),
+        "uniform": (2, random.uniform),
+        "normal": (2, lambda mean, sd: max(0.0, random.gauss(mean, sd))),
+        "lognormal": (2, lambda median, sigma: random.lognormvariate(math.log(max(median, 1e-3)), sigma)),
+        "exponential": (1, lambda mean: random.expovariate(1 / mean) if mean > 0 else 0.0),
+    }
+    if kind not in samplers or len(args) != samplers[kind][0]:
+        raise ValueError(f"Invalid latency spec: {spec!r}")
+    sample = samplers[kind][1]
+    return lambda: sample(*args) / 1000
+
+
+@dataclass
+class MockConfig:
+    latency: str = "lognormal:80,0.5"
+    # Fraction of requests answered 503 with Retry-After: error_retry_after
+    error_rate: float = 0.0
+    error_retry_after: int = 1
+    # Requests per token per fixed window before 429s; 0 disables rate limiting
+    rate_limit: int = 300
+    rate_window: float = 900.0
+    # Same token posting the same text within this many seconds gets a 403; 0 disables the check
+    duplicate_window: float = 86400.0
+    _sampler: Callable[[], float] = field(default=lambda: 0.0, repr=False)
+
+    def __post_init__(self) -> None:
+        self._sampler = parse_latency(self.latency)
+
+    def public(self) -> dict:
+        return {k: v for k, v in asdict(self).items() if not k.startswith("_")}
+
+
+@dataclass
+class _Window:
+    reset_at: float
+    used: int = 0
+
+
+class MockPlatform:
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.posts: dict[str, dict] = {}
+        self.windows: dict[str, _Window] = {}
+        self.recent: dict[str, float] = {}
+        self.stats: Counter[str] = Counter()
+
+    def rate_headers(self, token: str) -> tuple[dict[str, str], bool]:
+        """Charge one request to ``token``; returns the rate-limit headers and whether it is over budget."""
+        limit = self.config.rate_limit
+        if limit <= 0:
+            return {}, False
+        now = time.time()
+        window = self.windows.get(token)
+        if window is None or window.reset_at <= now:
+            window = self.windows[token] = _Window(reset_at=now + self.config.rate_window)
+        window.used += 1
+        headers = {
+            "x-rate-limit-limit": str(limit),
+            "x-rate-limit-remaining": str(max(0, limit - window.used)),
+            "x-rate-limit-reset": str(math.ceil(window.reset_at)),
+        }
+        return headers, window.used > limit
+
+    def is_duplicate(self, token: str, text: str) -> bool:
+        window = self.config.duplicate_window
+        if window <= 0:
+            return False
+        key = hashlib.sha256(f"{token}\0{text}".encode()).hexdigest()
+        now = time.time()
+        posted_at = self.recent.get(key)
+        if posted_at is not None and now - posted_at < window:
+            return True
+        self.recent[key] = now
+        if len(self.recent) > 100_000:
+            self.recent = {k: t for k, t in self.recent.items() if now - t < window}
+        return False
+
+    def metrics(self, post: dict) -> dict:
+        # Grows with age and differs per post, so successive engagement samples look plausible.
+        age = time.time() - post["created_at"]
+        seed = int(post["id"][:8], 16) % 7 + 1
+        likes = int(math.sqrt(age) * seed / 3)
+        return {"likes": likes, "reposts": likes // 5, "replies": likes // 10, "views": likes * 40 + int(age)}
+
+
+def create_app(config: MockConfig | None = None) -> FastAPI:
+    mock = MockPlatform(config or MockConfig())
+    app = FastAPI(title="Mock platform")
+    app.state.mock = mock
+
+    def _token(authorization: str | None) -> str | None:
+        if not authorization or not authorization.startswith("Bearer "):
+            return None
+        return authorization.removeprefix("Bearer ") or None
+
+    @app.middleware("http")
+    async def simulate(request: Request, call_next):
+        if request.url.path.startswith("/_"):
+            return await call_next(request)
+        delay = mock.config._sampler()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        token = _token(request.headers.get("authorization"))
+        if token is None:
+            mock.stats["401"] += 1
+            return JSONResponse({"detail": "missing bearer token"}, status_code=401)
+        headers, limited = mock.rate_headers(token)
+        if limited:
+            mock.stats["429"] += 1
+            return JSONResponse({"detail": "rate limit exceeded"}, status_code=429, headers=headers)
+        if mock.config.error_rate > 0 and random.random() < mock.config.error_rate:
+            mock.stats["503"] += 1
+            headers["retry-after"] = str(mock.config.error_retry_after)
+            return JSONResponse({"detail": "injected failure"}, status_code=503, headers=headers)
+
+        response = await call_next(request)
+        response.headers.update(headers)
+        mock.stats[str(response.status_code)] += 1
+        return response
+
+    @app.post("/posts", status_code=201)
+    async def create_post(request: Request, authorization: str | None = Header(default=None)):
+        body = await request.json()
+        text = body.get("text", "")
+        if mock.is_duplicate(_token(authorization), text):
+            return JSONResponse({"detail": "duplicate content"}, status_code=403)
+        post_id = uuid.uuid4().hex
+        mock.posts[post_id] = {"id": post_id, "text": text, "created_at": time.time()}
+        return {"data": {"id": post_id, "url": f"{request.base_url}posts/{post_id}", "text": text}}
+
+    @app.get("/posts")
+    async def lookup_posts(ids: str = ""):
+        wanted = [i for i in ids.split(",") if i]
+        if len(wanted) > LOOKUP_LIMIT:
+            return JSONResponse({"detail": f"at most {LOOKUP_LIMIT} ids"}, status_code=400)
+        found = [mock.posts[i] for i in wanted if i in mock.posts]
+        return {"data": [{"id": p["id"], "metrics": mock.metrics(p)} for p in found]}
+
+    @app.get("/posts/{post_id}")
+    async def get_post(post_id: str):
+        post = mock.posts.get(post_id)
+        if post is None:
+            return JSONResponse({"detail": "not found"}, status_code=404)
+        return {"data": {"id": post_id, "text": post["text"], "metrics": mock.metrics(post)}}
+
+    @app.delete("/posts/{post_id}")
+    async def delete_post(post_id: str):
+        return {"data": {"deleted": mock.posts.pop(post_id, None) is not None}}
+
+    @app.get("/me")
+    async def me(authorization: str | None = Header(default=None)):
+        return {"data": {"id": _token(authorization)}}
+
+    @app.get("/_stats")
+    async def stats():
+        return {"posts": len(mock.posts), "responses": dict(mock.stats)}
+
+    @app.delete("/_stats")
+    async def reset_stats():
+        mock.stats.clear()
+        return {"posts": len(mock.posts), "responses": {}}
+
+    @app.get("/_config")
+    async def get_config():
+        return mock.config.public()
+
+    @app.patch("/_config")
+    async def update_config(request: Request):
+        try:
+            mock.config = MockConfig(**{**mock.config.public(), **(await request.json())})
+        except (TypeError, ValueError) as e:
+            return JSONResponse({"detail": str(e)}, status_code=400)
+        mock.windows.clear()
+        return mock.config.public()
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    defaults = MockConfig()
+    parser = argparse.ArgumentParser(description="Local mock platform for the FAKE adapter")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", default=defaults.latency, help="e.g. fixed:50, uniform:20,200, lognormal:80,0.5")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--error-retry-after", type=int, default=defaults.error_retry_after)
+    parser.add_argument("--rate-limit", type=int, default=defaults.rate_limit)
+    parser.add_argument("--rate-window", type=float, default=defaults.rate_window)
+    parser.add_argument("--duplicate-window", type=float, default=defaults.duplicate_window)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_retry_after=args.error_retry_after,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        duplicate_window=args.duplicate_window,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,94 @@
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from collections import OrderedDict
+
+from social.config import get_settings
 from social.core.enums import Platform
 from social.platforms.base import PlatformAdapter
 
+logger = logging.getLogger(__name__)
+
 _adapters: dict[Platform, type[PlatformAdapter]] = {}
 
+# Live adapter instances keyed by (account id, credential fingerprint), least recently used first.
+# A credential change yields a new fingerprint, so stale instances are never handed out even in
+# processes that did not see the update; they simply age out.
+_instances: OrderedDict[tuple[uuid.UUID, str], PlatformAdapter] = OrderedDict()
+_closing: set[asyncio.Task] = set()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
 
 def register_adapter(platform: Platform, adapter_cls: type[PlatformAdapter]) -> None:
     _adapters[platform] = adapter_cls
 
 
-def get_adapter(platform: Platform, credentials: dict) -> PlatformAdapter:
+def get_adapter(platform: Platform, credentials: dict, account_id: uuid.UUID | None = None) -> PlatformAdapter:
     adapter_cls = _adapters.get(platform)
     if adapter_cls is None:
         raise ValueError(f"No adapter registered for platform: {platform}")
-    return adapter_cls(credentials=credentials)
+    if account_id is None:
+        return adapter_cls(credentials=credentials)
+
+    key = (account_id, _fingerprint(platform, credentials))
+    adapter = _instances.get(key)
+    if adapter is not None:
+        _instances.move_to_end(key)
+        _stats["hits"] += 1
+        return adapter
+
+    _stats["misses"] += 1
+    adapter = adapter_cls(credentials=credentials)
+    _instances[key] = adapter
+    max_size = get_settings().adapter_cache_size
+    while len(_instances) > max_size:
+        _, evicted = _instances.popitem(last=False)
+        _stats["evictions"] += 1
+        _close_later(evicted)
+    return adapter
+
+
+def invalidate_adapter(account_id: uuid.UUID) -> None:
+    for key in [k for k in _instances if k[0] == account_id]:
+        _close_later(_instances.pop(key))
+
+
+async def close_adapters() -> None:
+    adapters = list(_instances.values())
+    _instances.clear()
+    for adapter in adapters:
+        await _close(adapter)
+    if _closing:
+        await asyncio.gather(*_closing, return_exceptions=True)
+
+
+def adapter_cache_stats() -> dict:
+    return {**_stats, "size": len(_instances), "max_size": get_settings().adapter_cache_size}
 
 
 def list_adapters() -> list[Platform]:
     return list(_adapters.keys())
+
+
+def _fingerprint(platform: Platform, credentials: dict) -> str:
+    raw = json.dumps([platform, credentials], sort_keys=True, default=str).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _close_later(adapter: PlatformAdapter) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_close(adapter))
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+async def _close(adapter: PlatformAdapter) -> None:
+    try:
+        await adapter.close()
+    except Exception:
+        logger.warning("Error closing %s adapter", adapter.platform, exc_info=True)
@@ -3,58 +3,82 @@ import logging
 import httpx
 
 from social.core.enums import Platform
-from social.platforms.base import Engagement, PlatformAdapter, PostResult
+from social.platforms.base import Engagement, PlatformAdapter, PostResult, error_for_status, rate_limit_from_headers
+from social.platforms.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
 TWITTER_API = "https://api.twitter.com/2"
+# GET /2/tweets accepts up to 100 ids per lookup
+TWITTER_LOOKUP_LIMIT = 100
 
 
 class TwitterAdapter(PlatformAdapter):
     platform = Platform.TWITTER
+    engagement_batch_size = TWITTER_LOOKUP_LIMIT
 
     def __init__(self, credentials: dict):
         self.bearer_token = credentials["bearer_token"]
         self._headers = {"Authorization": f"Bearer {self.bearer_token}"}
 
+    def _check(self, resp: httpx.Response) -> None:
+        rate_limit = rate_limit_from_headers(resp.headers, "x-rate-limit-remaining", "x-rate-limit-reset")
+        if rate_limit is not None:
+            self.rate_limit = rate_limit
+        # Duplicate content comes back as a 403, so it is classified permanent like any other 4xx.
+        error = error_for_status(
+            resp.status_code,
+            resp.headers,
+            f"Twitter API {resp.status_code}: {resp.text[:200]}",
+            rate_limit.reset_at if rate_limit else None,
+        )
+        if error is not None:
+            raise error
+
     async def publish(self, content: str, media_urls: list[str] | None = None, **kwargs) -> PostResult:
         payload: dict = {"text": content}
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(f"{TWITTER_API}/tweets", headers=self._headers, json=payload, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()["data"]
-            tweet_id = data["id"]
-            return PostResult(
-                platform_post_id=tweet_id,
-                platform_post_url=f"https://x.com/i/status/{tweet_id}",
-                raw_response=data,
-            )
+        resp = await get_http_client(TWITTER_API).post("/tweets", headers=self._headers, json=payload)
+        self._check(resp)
+        data = resp.json()["data"]
+        tweet_id = data["id"]
+        return PostResult(
+            platform_post_id=tweet_id,
+            platform_post_url=f"https://x.com/i/status/{tweet_id}",
+            raw_response=data,
+        )
 
     async def delete(self, platform_post_id: str) -> bool:
-        async with httpx.AsyncClient() as client:
-            resp = await client.delete(f"{TWITTER_API}/tweets/{platform_post_id}", headers=self._headers, timeout=30)
-            resp.raise_for_status()
-            return resp.json().get("data", {}).get("deleted", False)
+        resp = await get_http_client(TWITTER_API).delete(f"/tweets/{platform_post_id}", headers=self._headers)
+        self._check(resp)
+        return resp.json().get("data", {}).get("deleted", False)
 
     async def get_engagement(self, platform_post_id: str) -> Engagement:
         params = {"tweet.fields": "public_metrics"}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{TWITTER_API}/tweets/{platform_post_id}", headers=self._headers, params=params, timeout=30
-            )
-            resp.raise_for_status()
-            metrics = resp.json().get("data", {}).get("public_metrics", {})
-            return Engagement(
-                likes=metrics.get("like_count", 0),
-                reposts=metrics.get("retweet_count", 0),
-                replies=metrics.get("reply_count", 0),
-                views=metrics.get("impression_count", 0),
-                extra={"quote_count": metrics.get("quote_count", 0)},
-            )
+        resp = await get_http_client(TWITTER_API).get(
+            f"/tweets/{platform_post_id}", headers=self._headers, params=params
+        )
+        self._check(resp)
+        return _engagement(resp.json().get("data", {}).get("public_metrics", {}))
+
+    async def get_engagements(self, platform_post_ids: list[str]) -> dict[str, Engagement]:
+        params = {"ids": ",".join(platform_post_ids), "tweet.fields": "public_metrics"}
+        resp = await get_http_client(TWITTER_API).get("/tweets", headers=self._headers, params=params)
+        self._check(resp)
+        # Deleted or protected tweets are reported under "errors" and simply left out.
+        return {tweet["id"]: _engagement(tweet.get("public_metrics", {})) for tweet in resp.json().get("data", [])}
 
     async def verify_credentials(self, credentials: dict) -> bool:
         token = credentials.get("bearer_token", self.bearer_token)
         headers = {"Authorization": f"Bearer {token}"}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{TWITTER_API}/users/me", headers=headers, timeout=15)
-            return resp.status_code == 200
+        resp = await get_http_client(TWITTER_API).get("/users/me", headers=headers, timeout=15)
+        return resp.status_code == 200
+
+
+def _engagement(metrics: dict) -> Engagement:
+    return Engagement(
+        likes=metrics.get("like_count", 0),
+        reposts=metrics.get("retweet_count", 0),
+        replies=metrics.get("reply_count", 0),
+        views=metrics.get("impression_count", 0),
+        extra={"quote_count": metrics.get("quote_count", 0)},
+    )
@@ -0,0 +1,96 @@
+import asyncio
+import heapq
+import logging
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from social.config import Settings
+from social.db.session import async_session
+from social.services.publish_service import upcoming_scheduled
+
+logger = logging.getLogger("social.scheduler")
+
+# How long past due a post is still preloaded, covering the gap between a schedule notify and the reload
+OVERDUE_GRACE = timedelta(seconds=10)
+
+
+class PrecisionScheduler:
+    """Fires SCHEDULED posts at their exact due time instead of on the next worker poll.
+
+    Posts due within ``worker_schedule_lookahead`` are preloaded into a min-heap keyed by due time
+    and handed to ``on_due`` the moment they come due. The whole set is reloaded every
+    ``worker_schedule_refresh`` seconds and whenever ``refresh()`` is called, so cancelled or newly
+    scheduled posts are picked up; a stale entry that still fires is harmless because the claim
+    re-checks each post's status and due time.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        on_due: Callable[[list[uuid.UUID]], None],
+        shard: tuple[int, int] | None = None,
+    ):
+        self.settings = settings
+        self.on_due = on_due
+        self.shard = shard
+        self._heap: list[tuple[datetime, uuid.UUID]] = []
+        # Current due time per post; heap entries that disagree are stale and skipped.
+        self._due: dict[uuid.UUID, datetime] = {}
+        self._refresh = asyncio.Event()
+
+    def refresh(self) -> None:
+        self._refresh.set()
+
+    async def run(self, shutdown: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        next_refresh = 0.0
+        stop_waiter = asyncio.create_task(shutdown.wait())
+        try:
+            while not shutdown.is_set():
+                if self._refresh.is_set() or loop.time() >= next_refresh:
+                    self._refresh.clear()
+                    next_refresh = loop.time() + self.settings.worker_schedule_refresh
+                    await self._reload()
+
+                self._fire()
+
+                timeout = next_refresh - loop.time()
+                if self._heap:
+                    until_due = (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+                    timeout = min(timeout, until_due)
+                refresh_waiter = asyncio.create_task(self._refresh.wait())
+                await asyncio.wait(
+                    {stop_waiter, refresh_waiter},
+                    timeout=max(0.0, timeout),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                refresh_waiter.cancel()
+        finally:
+            stop_waiter.cancel()
+
+    async def _reload(self) -> None:
+        now = datetime.now(timezone.utc)
+        until = now + timedelta(seconds=self.settings.worker_schedule_lookahead)
+        try:
+            async with async_session() as db:
+                upcoming = await upcoming_scheduled(db, now - OVERDUE_GRACE, until, self.shard)
+        except Exception:
+            logger.exception("Failed to load scheduled posts")
+            return
+        self._due = dict(upcoming)
+        self._heap = [(due, post_id) for post_id, due in upcoming]
+        heapq.heapify(self._heap)
+        if upcoming:
+            logger.debug("Preloaded %d scheduled posts, next at %s", len(upcoming), self._heap[0][0].isoformat())
+
+    def _fire(self) -> None:
+        now = datetime.now(timezone.utc)
+        due: list[uuid.UUID] = []
+        while self._heap and self._heap[0][0] <= now:
+            at, post_id = heapq.heappop(self._heap)
+            if self._due.get(post_id) == at:
+                del self._due[post_id]
+                due.append(post_id)
+        if due:
+            self.on_due(due)
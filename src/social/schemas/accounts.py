@@ -1,10 +1,14 @@
 import uuid
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
+from social.core.encryption import SESSION_METADATA_KEY
 from social.core.enums import AccountStatus, Platform
 
+AccountExpand = Literal["post_counts"]
+
 
 class AccountCreate(BaseModel):
     entity_id: uuid.UUID
@@ -36,3 +40,12 @@ class AccountOut(BaseModel):
     metadata: dict | None = Field(default=None, validation_alias="metadata_")
     created_at: datetime
     updated_at: datetime
+    # Only present with ?expand=post_counts
+    post_counts: dict[str, int] | None = None
+
+    @field_validator("metadata")
+    @classmethod
+    def hide_session(cls, v: dict | None) -> dict | None:
+        if v and SESSION_METADATA_KEY in v:
+            return {k: val for k, val in v.items() if k != SESSION_METADATA_KEY}
+        return v
@@ -1,9 +1,13 @@
 import uuid
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
 from social.core.enums import EntityType
+from social.schemas.accounts import AccountOut
+
+EntityExpand = Literal["accounts", "post_counts"]
 
 
 class EntityCreate(BaseModel):
@@ -29,3 +33,7 @@ class EntityOut(BaseModel):
     metadata: dict | None = Field(default=None, validation_alias="metadata_")
     created_at: datetime
     updated_at: datetime
+    # Only present with ?expand=accounts / ?expand=post_counts. Accounts are read from the plain
+    # attribute set by expand_entities because the Entity.accounts relationship is never loaded.
+    expanded_accounts: list[AccountOut] | None = Field(default=None, serialization_alias="accounts")
+    post_counts: dict[str, int] | None = None
@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel, Field
 
@@ -14,10 +15,17 @@ class PostCreate(BaseModel):
     media_urls: list[str] | None = None
     scheduled_for: datetime | None = None
     source: str | None = None
+    # 0 (default) to 9; higher is claimed first, and WORKER_HIGH_PRIORITY and above get reserved workers
+    priority: int = Field(default=0, ge=0, le=9)
+
+
+MAX_BULK_POSTS = 5000
 
 
 class PostBulk(BaseModel):
-    posts: list[PostCreate]
+    # Items are validated one by one in the service, so a bad item is reported by index instead
+    # of rejecting the whole request.
+    posts: list[Any] = Field(min_length=1, max_length=MAX_BULK_POSTS)
 
 
 class PostOut(BaseModel):
@@ -37,6 +45,28 @@ class PostOut(BaseModel):
     error: str | None = None
     engagement: dict | None = None
     source: str | None = None
+    priority: int
     retry_count: int
     created_at: datetime
     updated_at: datetime
+
+
+class EngagementSampleOut(BaseModel):
+    model_config = {"from_attributes": True}
+
+    sampled_at: datetime
+    likes: int
+    reposts: int
+    replies: int
+    views: int
+    extra: dict | None = None
+
+
+class PostBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class PostBulkOut(BaseModel):
+    created: list[PostOut]
+    errors: list[PostBulkError]
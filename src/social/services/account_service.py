@@ -1,15 +1,22 @@
 import logging
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from social.core.encryption import decrypt_credentials, encrypt_credentials
-from social.core.enums import Platform
+from social.core.encryption import (
+    SESSION_METADATA_KEY,
+    decrypt_credentials,
+    encrypt_credentials,
+    forget_credentials,
+)
+from social.core.enums import AccountStatus, Platform
 from social.core.exceptions import NotFound
-from social.db.models import Account
-from social.platforms.registry import get_adapter
-from social.schemas.accounts import AccountCreate, AccountUpdate
+from social.core.pagination import paginate
+from social.db.models import Account, Post
+from social.platforms.registry import get_adapter, invalidate_adapter
+from social.schemas.accounts import AccountCreate, AccountExpand, AccountUpdate
+from social.services.post_service import count_posts
 
 logger = logging.getLogger(__name__)
 
@@ -45,38 +52,65 @@ async def list_accounts(
     platform: Platform | None = None,
     limit: int = 100,
     offset: int = 0,
+    cursor: str | None = None,
 ) -> list[Account]:
     q = select(Account)
     if entity_id:
         q = q.where(Account.entity_id == entity_id)
     if platform:
         q = q.where(Account.platform == platform)
-    q = q.order_by(Account.created_at.desc()).limit(limit).offset(offset)
+    q = paginate(q, Account, limit, offset, cursor)
     result = await db.execute(q)
     return list(result.scalars().all())
 
 
+async def expand_accounts(db: AsyncSession, accounts: list[Account], expand: list[AccountExpand]) -> None:
+    if "post_counts" in expand:
+        counts = await count_posts(db, Post.account_id, [a.id for a in accounts])
+        for account in accounts:
+            account.post_counts = counts[account.id]
+
+
 async def update_account(db: AsyncSession, account_id: uuid.UUID, data: AccountUpdate) -> Account:
     account = await get_account(db, account_id)
     update_data = data.model_dump(exclude_unset=True)
 
-    if "credentials" in update_data and update_data["credentials"] is not None:
-        update_data["credentials"] = encrypt_credentials(update_data["credentials"])
+    if "credentials" in update_data:
+        forget_credentials(account.credentials)
+        if update_data["credentials"] is not None:
+            update_data["credentials"] = encrypt_credentials(update_data["credentials"])
 
+    # The stored login session is internal: it survives metadata edits but not a credential change.
+    session = None if "credentials" in update_data else (account.metadata_ or {}).get(SESSION_METADATA_KEY)
     if "metadata" in update_data:
-        update_data["metadata_"] = update_data.pop("metadata")
+        metadata = update_data.pop("metadata")
+        if session is not None:
+            metadata = {**(metadata or {}), SESSION_METADATA_KEY: session}
+        update_data["metadata_"] = metadata
+    elif "credentials" in update_data and SESSION_METADATA_KEY in (account.metadata_ or {}):
+        update_data["metadata_"] = {k: v for k, v in account.metadata_.items() if k != SESSION_METADATA_KEY}
+
+    # New credentials put an account whose old ones were rejected back in service.
+    if update_data.get("credentials") and "status" not in update_data and account.status == AccountStatus.EXPIRED:
+        update_data["status"] = AccountStatus.ACTIVE
 
     for field, value in update_data.items():
         setattr(account, field, value)
     await db.flush()
     await db.refresh(account)
+    if "credentials" in update_data:
+        invalidate_adapter(account.id)
     return account
 
 
 async def delete_account(db: AsyncSession, account_id: uuid.UUID) -> None:
     account = await get_account(db, account_id)
+    # Account.posts is never loaded, so detach the posts in one statement rather than row by row.
+    await db.execute(update(Post).where(Post.account_id == account_id).values(account_id=None))
     await db.delete(account)
     await db.flush()
+    forget_credentials(account.credentials)
+    invalidate_adapter(account_id)
 
 
 async def verify_account(db: AsyncSession, account_id: uuid.UUID) -> dict:
@@ -85,7 +119,7 @@ async def verify_account(db: AsyncSession, account_id: uuid.UUID) -> dict:
         return {"status": "error", "message": "No credentials stored for this account"}
     try:
         credentials = decrypt_credentials(account.credentials)
-        adapter = get_adapter(account.platform, credentials)
+        adapter = get_adapter(account.platform, credentials, account.id)
         valid = await adapter.verify_credentials(credentials)
         if valid:
             return {"status": "ok", "message": f"{account.platform} credentials verified"}
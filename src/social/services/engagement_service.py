@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import DateTime, cast, column, delete, func, insert, select, update, values
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from social.config import get_settings
+from social.core.enums import AccountStatus
+from social.core.sharding import shard_clause
+from social.db.models import Account, EngagementSample, Post
+from social.db.session import async_session
+from social.platforms.base import Engagement, RateLimited
+from social.services.publish_service import account_adapter, save_session
+
+logger = logging.getLogger(__name__)
+
+# pg advisory lock id that keeps rollups to one worker at a time
+ROLLUP_LOCK_KEY = 0x5EED_0022
+
+
+async def claim_due_engagement(
+    db: AsyncSession, limit: int, shard: tuple[int, int] | None = None
+) -> list[tuple[uuid.UUID, str | None, datetime | None, Account | None]]:
+    """Take up to ``limit`` posts whose engagement is due, oldest due first.
+
+    Their due time is pushed ahead by the shortest tier interval as they are taken, so concurrent
+    refreshers never pick the same posts and a refresher that dies mid-run just leaves them for
+    the next round.
+    """
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    due = select(Post.id).where(Post.engagement_due_at <= now)
+    if shard is not None:
+        due = due.where(shard_clause(Post.account_id, *shard))
+    due = due.order_by(Post.engagement_due_at).limit(limit).with_for_update(skip_locked=True).cte("due")
+    claimed = (
+        update(Post)
+        .where(Post.id == due.c.id)
+        .values(engagement_due_at=now + timedelta(seconds=settings.engagement_tiers[0][1]))
+        .returning(Post.id, Post.account_id, Post.platform_post_id, Post.posted_at)
+        .cte("claimed")
+    )
+    stmt = select(claimed.c.id, claimed.c.platform_post_id, claimed.c.posted_at, Account).outerjoin(
+        Account, Account.id == claimed.c.account_id
+    )
+    result = await db.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+
+async def refresh_engagement(shard: tuple[int, int] | None = None) -> int:
+    """Refresh one batch of due posts, one multi-id lookup per account and chunk; returns posts taken."""
+    settings = get_settings()
+    async with async_session() as db:
+        due = await claim_due_engagement(db, settings.engagement_batch_size, shard)
+        await db.commit()
+    if not due:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    by_account: dict[uuid.UUID, list[tuple[uuid.UUID, str, datetime | None]]] = defaultdict(list)
+    accounts: dict[uuid.UUID, Account] = {}
+    # (post id, engagement or None to keep the old value, next due time or None to stop tracking)
+    results: list[tuple[uuid.UUID, dict | None, datetime | None]] = []
+    samples: list[dict] = []
+    sessions: dict[uuid.UUID, str] = {}
+    for post_id, platform_post_id, posted_at, account in due:
+        usable = account is not None and account.credentials and account.status == AccountStatus.ACTIVE
+        if not usable or not platform_post_id:
+            results.append((post_id, None, None))
+            continue
+        accounts[account.id] = account
+        by_account[account.id].append((post_id, platform_post_id, posted_at))
+
+    semaphore = asyncio.Semaphore(settings.engagement_concurrency)
+
+    async def refresh_account(account: Account, posts: list[tuple[uuid.UUID, str, datetime | None]]) -> None:
+        async with semaphore:
+            try:
+                adapter = account_adapter(account)
+            except Exception:
+                logger.exception("Engagement refresh: no adapter for account %s", account.id)
+                return
+            size = max(1, adapter.engagement_batch_size)
+            try:
+                for start in range(0, len(posts), size):
+                    chunk = posts[start : start + size]
+                    try:
+                        found = await adapter.get_engagements([platform_post_id for _, platform_post_id, _ in chunk])
+                    except RateLimited as e:
+                        # The rest stay claimed and come round again next interval.
+                        logger.info("Engagement refresh for account %s rate limited: %s", account.id, e)
+                        return
+                    except Exception as e:
+                        logger.warning("Engagement refresh failed for account %s: %s", account.id, e)
+                        continue
+                    for post_id, platform_post_id, posted_at in chunk:
+                        engagement = found.get(platform_post_id)
+                        # Posts the platform no longer returns were deleted there; stop tracking them.
+                        next_due = _next_due(posted_at, now) if engagement is not None else None
+                        results.append((post_id, _serialize(engagement, now), next_due))
+                        if engagement is not None:
+                            samples.append(_sample(post_id, engagement, now))
+            finally:
+                # A lookup may have logged in again or rotated the session; saved as write_outcomes does.
+                session = adapter.take_session_update()
+                if session:
+                    sessions[account.id] = session
+
+    await asyncio.gather(*(refresh_account(accounts[account_id], posts) for account_id, posts in by_account.items()))
+
+    async with async_session() as db:
+        await write_engagement(db, results, samples, sessions)
+        await db.commit()
+    logger.info(
+        "Refreshed engagement for %d of %d due posts across %d accounts", len(results), len(due), len(by_account)
+    )
+    return len(due)
+
+
+async def write_engagement(
+    db: AsyncSession,
+    results: list[tuple[uuid.UUID, dict | None, datetime | None]],
+    samples: list[dict],
+    sessions: dict[uuid.UUID, str] | None = None,
+) -> None:
+    # Post.engagement keeps the latest reading for the API; the series goes to engagement_samples.
+    for account_id, session in (sessions or {}).items():
+        await save_session(db, account_id, session)
+    if samples:
+        await db.execute(insert(EngagementSample), samples)
+    if not results:
+        return
+    rows = values(
+        column("id", UUID(as_uuid=True)),
+        column("engagement", JSONB(none_as_null=True)),
+        column("due_at", DateTime(timezone=True)),
+        name="refreshed",
+    ).data(results)
+    await db.execute(
+        update(Post)
+        .where(Post.id == rows.c.id)
+        .values(
+            engagement=func.coalesce(cast(rows.c.engagement, JSONB), Post.engagement),
+            engagement_due_at=cast(rows.c.due_at, DateTime(timezone=True)),
+        )
+    )
+
+
+async def get_series(db: AsyncSession, post_id: uuid.UUID) -> list[EngagementSample]:
+    result = await db.execute(
+        select(EngagementSample).where(EngagementSample.post_id == post_id).order_by(EngagementSample.sampled_at)
+    )
+    return list(result.scalars().all())
+
+
+async def rollup_engagement() -> int:
+    """Thin old samples to the last one per bucket for each configured rollup; returns rows removed.
+
+    Counts are cumulative, so the last reading in a bucket loses nothing a coarser curve needs.
+    Each run looks at whole buckets that crossed the rollup age within the last two rollup
+    intervals, so the scan stays small and every bucket is covered as long as the loop keeps up.
+    """
+    settings = get_settings()
+    removed = 0
+    async with async_session() as db:
+        # One worker at a time; the others skip this round.
+        if not await db.scalar(select(func.pg_try_advisory_xact_lock(ROLLUP_LOCK_KEY))):
+            return 0
+        for age, unit in settings.engagement_rollups:
+            horizon = func.now() - timedelta(seconds=age)
+            lower = func.date_trunc(unit, horizon - timedelta(seconds=2 * settings.engagement_rollup_interval))
+            upper = func.date_trunc(unit, horizon)
+            bucket = func.date_trunc(unit, EngagementSample.sampled_at)
+            ranked = (
+                select(
+                    EngagementSample.post_id,
+                    EngagementSample.sampled_at,
+                    func.row_number()
+                    .over(partition_by=(EngagementSample.post_id, bucket), order_by=EngagementSample.sampled_at.desc())
+                    .label("rank"),
+                )
+                .where(EngagementSample.sampled_at >= lower, EngagementSample.sampled_at < upper)
+                .subquery()
+            )
+            result = await db.execute(
+                delete(EngagementSample).where(
+                    EngagementSample.post_id == ranked.c.post_id,
+                    EngagementSample.sampled_at == ranked.c.sampled_at,
+                    ranked.c.rank > 1,
+                )
+            )
+            removed += result.rowcount
+        await db.commit()
+    if removed:
+        logger.info("Engagement rollup removed %d samples", removed)
+    return removed
+
+
+def _next_due(posted_at: datetime | None, now: datetime) -> datetime | None:
+    # The youngest tier the post still falls in sets the interval; past the last tier, stop.
+    age = (now - posted_at).total_seconds() if posted_at is not None else 0.0
+    for max_age, interval in get_settings().engagement_tiers:
+        if age < max_age:
+            return now + timedelta(seconds=interval)
+    return None
+
+
+def _sample(post_id: uuid.UUID, engagement: Engagement, now: datetime) -> dict:
+    return {
+        "post_id": post_id,
+        "sampled_at": now,
+        "likes": engagement.likes,
+        "reposts": engagement.reposts,
+        "replies": engagement.replies,
+        "views": engagement.views,
+        "extra": engagement.extra or None,
+    }
+
+
+def _serialize(engagement: Engagement | None, now: datetime) -> dict | None:
+    if engagement is None:
+        return None
+    return {**asdict(engagement), "refreshed_at": now.isoformat()}
@@ -1,4 +1,5 @@
 import uuid
+from collections import defaultdict
 from datetime import datetime, timezone
 
 from sqlalchemy import select
@@ -6,8 +7,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from social.core.enums import EntityType
 from social.core.exceptions import Conflict, NotFound
-from social.db.models import Entity
-from social.schemas.entities import EntityCreate, EntityUpdate
+from social.core.pagination import paginate
+from social.db.models import Account, Entity, Post
+from social.schemas.entities import EntityCreate, EntityExpand, EntityUpdate
+from social.services.post_service import count_posts
 
 
 async def create_entity(db: AsyncSession, data: EntityCreate) -> Entity:
@@ -36,16 +39,38 @@ async def get_entity(db: AsyncSession, entity_id: uuid.UUID) -> Entity:
 
 
 async def list_entities(
-    db: AsyncSession, entity_type: EntityType | None = None, limit: int = 100, offset: int = 0
+    db: AsyncSession,
+    entity_type: EntityType | None = None,
+    limit: int = 100,
+    offset: int = 0,
+    cursor: str | None = None,
 ) -> list[Entity]:
     q = select(Entity).where(Entity.deleted_at.is_(None))
     if entity_type:
         q = q.where(Entity.type == entity_type)
-    q = q.order_by(Entity.created_at.desc()).limit(limit).offset(offset)
+    q = paginate(q, Entity, limit, offset, cursor)
     result = await db.execute(q)
     return list(result.scalars().all())
 
 
+async def expand_entities(db: AsyncSession, entities: list[Entity], expand: list[EntityExpand]) -> None:
+    # Each expansion is one batched query for the whole page, attached as a plain attribute so the
+    # relationship itself stays unloaded.
+    ids = [e.id for e in entities]
+    if "accounts" in expand:
+        by_entity: dict[uuid.UUID, list[Account]] = defaultdict(list)
+        if ids:
+            result = await db.execute(select(Account).where(Account.entity_id.in_(ids)).order_by(Account.created_at))
+            for account in result.scalars():
+                by_entity[account.entity_id].append(account)
+        for entity in entities:
+            entity.expanded_accounts = by_entity[entity.id]
+    if "post_counts" in expand:
+        counts = await count_posts(db, Post.entity_id, ids)
+        for entity in entities:
+            entity.post_counts = counts[entity.id]
+
+
 async def update_entity(db: AsyncSession, entity_id: uuid.UUID, data: EntityUpdate) -> Entity:
     entity = await get_entity(db, entity_id)
     update_data = data.model_dump(exclude_unset=True)
@@ -1,12 +1,27 @@
+import csv
+import io
+import json
 import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
 
-from sqlalchemy import select
+from pydantic import ValidationError
+from sqlalchemy import Select, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
 from social.core.enums import Platform, PostStatus
 from social.core.exceptions import BadRequest, NotFound
-from social.db.models import Post
-from social.schemas.posts import PostCreate
+from social.core.pagination import paginate
+from social.db.models import Account, Entity, Post
+from social.db.notify import SCHEDULE_PAYLOAD, notify_posts
+from social.db.session import async_session
+from social.schemas.posts import PostBulkError, PostCreate, PostOut
+from social.services import ready_queue
+
+# Rows fetched per server-side cursor round trip during export
+EXPORT_CHUNK_SIZE = 1000
 
 
 async def create_post(db: AsyncSession, data: PostCreate) -> Post:
@@ -21,13 +36,78 @@ async def create_post(db: AsyncSession, data: PostCreate) -> Post:
         status=status,
         scheduled_for=data.scheduled_for,
         source=data.source,
+        priority=data.priority,
     )
     db.add(post)
     await db.flush()
     await db.refresh(post)
+    ready_queue.stage(db, post.id, post.scheduled_for, post.account_id)
+    if status == PostStatus.QUEUED:
+        await notify_posts(db, str(post.id))
+    else:
+        await notify_posts(db, SCHEDULE_PAYLOAD)
     return post
 
 
+async def create_posts(db: AsyncSession, raw_items: list[Any]) -> tuple[list[Post], list[PostBulkError]]:
+    # Each raw item is validated on its own, and referential checks are done up front in two
+    # queries, so one bad item is reported instead of failing the whole batch.
+    errors: list[PostBulkError] = []
+    items: list[tuple[int, PostCreate]] = []
+    for index, raw in enumerate(raw_items):
+        try:
+            items.append((index, PostCreate.model_validate(raw)))
+        except ValidationError as e:
+            errors.append(PostBulkError(index=index, detail=_validation_detail(e)))
+
+    entity_ids = {item.entity_id for _, item in items}
+    account_ids = {item.account_id for _, item in items if item.account_id}
+    known_entities: set[uuid.UUID] = set()
+    if entity_ids:
+        result = await db.execute(select(Entity.id).where(Entity.id.in_(entity_ids), Entity.deleted_at.is_(None)))
+        known_entities = set(result.scalars())
+    known_accounts: set[uuid.UUID] = set()
+    if account_ids:
+        result = await db.execute(select(Account.id).where(Account.id.in_(account_ids)))
+        known_accounts = set(result.scalars())
+
+    rows: list[dict] = []
+    for index, item in items:
+        if item.entity_id not in known_entities:
+            errors.append(PostBulkError(index=index, detail="Entity not found"))
+            continue
+        if item.account_id and item.account_id not in known_accounts:
+            errors.append(PostBulkError(index=index, detail="Account not found"))
+            continue
+        rows.append(
+            {
+                "entity_id": item.entity_id,
+                "account_id": item.account_id,
+                "platform": item.platform,
+                "content": item.content,
+                "media_urls": item.media_urls,
+                "status": PostStatus.SCHEDULED if item.scheduled_for else PostStatus.QUEUED,
+                "scheduled_for": item.scheduled_for,
+                "source": item.source,
+                "priority": item.priority,
+            }
+        )
+
+    if not rows:
+        return [], sorted(errors, key=lambda error: error.index)
+
+    # Batched multi-row INSERT ... RETURNING, in the same transaction as the request.
+    result = await db.scalars(insert(Post).returning(Post, sort_by_parameter_order=True), rows)
+    posts = list(result.all())
+    for post in posts:
+        ready_queue.stage(db, post.id, post.scheduled_for, post.account_id)
+    if any(post.status == PostStatus.QUEUED for post in posts):
+        await notify_posts(db)
+    if any(post.status == PostStatus.SCHEDULED for post in posts):
+        await notify_posts(db, SCHEDULE_PAYLOAD)
+    return posts, sorted(errors, key=lambda error: error.index)
+
+
 async def get_post(db: AsyncSession, post_id: uuid.UUID) -> Post:
     result = await db.execute(select(Post).where(Post.id == post_id))
     post = result.scalar_one_or_none()
@@ -44,8 +124,47 @@ async def list_posts(
     status: PostStatus | None = None,
     limit: int = 100,
     offset: int = 0,
+    cursor: str | None = None,
 ) -> list[Post]:
-    q = select(Post)
+    q = _filter_posts(select(Post), entity_id, account_id, platform, status)
+    q = paginate(q, Post, limit, offset, cursor)
+    result = await db.execute(q)
+    return list(result.scalars().all())
+
+
+async def export_posts(
+    fmt: str,
+    entity_id: uuid.UUID | None = None,
+    account_id: uuid.UUID | None = None,
+    platform: Platform | None = None,
+    status: PostStatus | None = None,
+) -> AsyncIterator[str]:
+    # Plain column rows from a server-side cursor: no ORM identity map or Pydantic models, so
+    # memory stays flat however many rows match. Runs in its own session because the response
+    # body is produced after the request's dependencies have finished.
+    fields = list(PostOut.model_fields)
+    q = select(*(Post.__table__.c[f] for f in fields))
+    q = _filter_posts(q, entity_id, account_id, platform, status).order_by(Post.created_at.desc(), Post.id.desc())
+
+    if fmt == "csv":
+        yield _csv_line(fields)
+
+    async with async_session() as db:
+        result = await db.stream(q.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for rows in result.partitions():
+            if fmt == "csv":
+                yield "".join(_csv_line([_csv_value(v) for v in row]) for row in rows)
+            else:
+                yield "".join(json.dumps(dict(zip(fields, row)), default=_json_default) + "\n" for row in rows)
+
+
+def _filter_posts(
+    q: Select,
+    entity_id: uuid.UUID | None,
+    account_id: uuid.UUID | None,
+    platform: Platform | None,
+    status: PostStatus | None,
+) -> Select:
     if entity_id:
         q = q.where(Post.entity_id == entity_id)
     if account_id:
@@ -54,9 +173,44 @@ async def list_posts(
         q = q.where(Post.platform == platform)
     if status:
         q = q.where(Post.status == status)
-    q = q.order_by(Post.created_at.desc()).limit(limit).offset(offset)
-    result = await db.execute(q)
-    return list(result.scalars().all())
+    return q
+
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc']) or 'item'}: {e['msg']}" for e in error.errors())
+
+
+def _csv_line(values: list) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(values)
+    return buf.getvalue()
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+async def count_posts(
+    db: AsyncSession, column: InstrumentedAttribute, ids: list[uuid.UUID]
+) -> dict[uuid.UUID, dict[str, int]]:
+    # Per-owner post counts by status in one grouped query, served by the (owner, status) indexes.
+    counts: dict[uuid.UUID, dict[str, int]] = {owner_id: {} for owner_id in ids}
+    if not ids:
+        return counts
+    result = await db.execute(
+        select(column, Post.status, func.count()).where(column.in_(ids)).group_by(column, Post.status)
+    )
+    for owner_id, status, n in result.all():
+        counts[owner_id][status] = n
+    return counts
 
 
 async def cancel_post(db: AsyncSession, post_id: uuid.UUID) -> Post:
@@ -65,4 +219,6 @@ async def cancel_post(db: AsyncSession, post_id: uuid.UUID) -> Post:
         raise BadRequest(f"Cannot cancel post with status '{post.status}'")
     await db.delete(post)
     await db.flush()
+    if post.status == PostStatus.SCHEDULED:
+        await notify_posts(db, SCHEDULE_PAYLOAD)
     return post
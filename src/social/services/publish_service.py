@@ -1,94 +1,530 @@
 import logging
+import random
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import or_, select, update
+from sqlalchemy import (
+    ARRAY,
+    DateTime,
+    Integer,
+    Select,
+    String,
+    Text,
+    all_,
+    case,
+    cast,
+    column,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from social.config import get_settings
-from social.core.encryption import decrypt_credentials
-from social.core.enums import PostStatus
-from social.db.models import Account, Post
+from social.core.encryption import SESSION_METADATA_KEY, decrypt_credentials, encrypt_credentials
+from social.core.enums import AccountStatus, Platform, PostStatus
+from social.core.ratelimit import get_rate_limiter
+from social.core.sharding import shard_clause
+from social.db.models import CLAIMABLE_POST_WHERE, Account, Entity, Post
+from social.db.notify import notify_posts
+from social.platforms.base import (
+    AuthExpired,
+    PermanentError,
+    PlatformAdapter,
+    RateLimit,
+    RateLimited,
+    RetryableError,
+)
 from social.platforms.registry import get_adapter
+from social.services import ready_queue
 
 logger = logging.getLogger(__name__)
 
+# Entity.metadata key holding the entity's share of worker claims relative to the default of 1.
+CLAIM_WEIGHT_KEY = "claim_weight"
 
-async def claim_ready_posts(db: AsyncSession, batch_size: int) -> list[Post]:
+
+async def claim_ready_posts(
+    db: AsyncSession,
+    batch_size: int,
+    post_ids: list[uuid.UUID] | None = None,
+    lease_owner: str | None = None,
+    shard: tuple[int, int] | None = None,
+    min_priority: int | None = None,
+) -> list[tuple[Post, Account | None]]:
     now = datetime.now(timezone.utc)
     settings = get_settings()
+    lease_expires_at = now + timedelta(seconds=settings.worker_lease_seconds)
 
+    # One round trip: lock the ready rows, flip them to POSTING and hand them back joined to
+    # their account, so processing never has to re-read the post or its credentials.
+    claimable = _claimable(now, post_ids, shard, min_priority)
+    candidates = select(Post.id).where(*claimable)
+    if settings.worker_fair_claims:
+        candidates = _fair_order(candidates, claimable, batch_size, settings.worker_fair_per_platform)
+    else:
+        candidates = candidates.order_by(Post.priority.desc(), Post.created_at)
+    ready = candidates.limit(batch_size).with_for_update(of=Post, skip_locked=True).cte("ready")
+    claimed = (
+        update(Post)
+        .where(Post.id == ready.c.id)
+        .values(
+            status=PostStatus.POSTING,
+            lease_owner=lease_owner,
+            lease_expires_at=lease_expires_at,
+            # A reclaimed post may already have reached the platform, so it counts as an attempt.
+            retry_count=case((Post.status == PostStatus.POSTING, Post.retry_count + 1), else_=Post.retry_count),
+        )
+        .returning(*Post.__table__.c)
+        .cte("claimed")
+    )
+    claimed_post = aliased(Post, claimed)
     stmt = (
-        select(Post)
+        select(claimed_post, Account)
+        .outerjoin(Account, Account.id == claimed_post.account_id)
+        .order_by(claimed_post.created_at)
+    )
+
+    result = await db.execute(stmt)
+    return [(post, account) for post, account in result.all()]
+
+
+async def peek_ready_posts(
+    db: AsyncSession,
+    limit: int,
+    exclude: set[uuid.UUID] | None = None,
+    shard: tuple[int, int] | None = None,
+    min_priority: int | None = None,
+) -> list[tuple[Post, Account | None]]:
+    """Read up to ``limit`` posts the claim would take, without claiming them (shadow mode)."""
+    claimable = _claimable(datetime.now(timezone.utc), None, shard, min_priority)
+    if exclude:
+        claimable.append(Post.id != all_(literal(list(exclude), ARRAY(UUID(as_uuid=True)))))
+    result = await db.execute(
+        select(Post, Account)
+        .outerjoin(Account, Account.id == Post.account_id)
+        .where(*claimable)
+        .order_by(Post.priority.desc(), Post.created_at)
+        .limit(limit)
+    )
+    return [(post, account) for post, account in result.all()]
+
+
+def _claimable(
+    now: datetime,
+    post_ids: list[uuid.UUID] | None = None,
+    shard: tuple[int, int] | None = None,
+    min_priority: int | None = None,
+) -> list:
+    settings = get_settings()
+    claimable = [
+        or_(
+            (Post.status == PostStatus.QUEUED) & or_(Post.next_retry_at.is_(None), Post.next_retry_at <= now),
+            (Post.status == PostStatus.SCHEDULED) & (Post.scheduled_for <= now),
+            (Post.status == PostStatus.FAILED)
+            & (Post.retry_count < settings.worker_max_retries)
+            & (Post.next_retry_at <= now),
+            # Orphaned by a worker that died or stopped heartbeating.
+            (Post.status == PostStatus.POSTING)
+            & (Post.retry_count < settings.worker_max_retries)
+            & (Post.lease_expires_at < now),
+        ),
+        # Leave posts for accounts whose platform budget is spent until the window resets, and for
+        # accounts whose credentials were rejected until they are replaced.
+        ~exists()
         .where(
+            Account.id == Post.account_id,
             or_(
-                Post.status == PostStatus.QUEUED,
-                (Post.status == PostStatus.SCHEDULED) & (Post.scheduled_for <= now),
-                (Post.status == PostStatus.FAILED)
-                & (Post.retry_count < settings.worker_max_retries)
-                & (Post.next_retry_at <= now),
-            )
+                (Account.rate_limit_remaining <= 0) & (Account.rate_limit_reset > now),
+                Account.status.in_([AccountStatus.EXPIRED, AccountStatus.REVOKED]),
+            ),
         )
-        .order_by(Post.created_at)
+        .correlate(Post),
+    ]
+    if post_ids is not None:
+        # Ids handed out by the Redis ready queue; the predicate above still decides what is claimable.
+        claimable.append(Post.id.in_(post_ids))
+    if shard is not None:
+        # (index, count): this worker process only sees the accounts hashed to its partition.
+        claimable.append(shard_clause(Post.account_id, *shard))
+    if min_priority is not None:
+        claimable.append(Post.priority >= min_priority)
+    return claimable
+
+
+def _fair_order(candidates: Select, claimable: list, batch_size: int, per_platform: bool) -> Select:
+    # Weighted round-robin across entities within each priority: an entity's n-th oldest ready post
+    # gets turn n / weight, and the batch takes the lowest turns. Every entity's first post outranks the second post of
+    # anyone else, so a small entity's wait doesn't grow with the size of another entity's backlog.
+    # No entity can contribute more than batch_size posts, so each entity only ranks its first
+    # batch_size ready posts, read in order from ix_posts_entity_claim. The entities come from a
+    # loose index scan of the same index, one probe per entity with claimable posts, so the work is
+    # bounded by those entities x batch_size, not by the largest backlog or the entities table.
+    # Predicates stay on the locking query too, so a row another worker just claimed is rechecked.
+    indexed = text(f"({CLAIMABLE_POST_WHERE})")
+    first = select(Post.entity_id).where(indexed).order_by(Post.entity_id).limit(1)
+    entities = first.cte("ready_entities", recursive=True)
+    following = (
+        select(Post.entity_id)
+        .where(indexed, Post.entity_id > entities.c.entity_id)
+        .order_by(Post.entity_id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    entities = entities.union_all(select(following).where(entities.c.entity_id.is_not(None)))
+
+    weight = Entity.metadata_[CLAIM_WEIGHT_KEY]
+    weight = case(
+        (func.jsonb_typeof(weight) == "number", func.greatest(weight.as_float(), 0.01)),
+        else_=1.0,
+    )
+    head = (
+        select(Post.id, Post.priority, Post.platform, Post.created_at)
+        .where(Post.entity_id == Entity.id, indexed, *claimable)
+        .order_by(Post.priority.desc(), Post.created_at)
         .limit(batch_size)
-        .with_for_update(skip_locked=True)
+        .lateral("head")
+    )
+    partition = [head.c.priority, Entity.id]
+    if per_platform:
+        partition.append(head.c.platform)
+    position = func.row_number().over(partition_by=partition, order_by=(head.c.created_at, head.c.id))
+    ranked = (
+        select(head.c.id, (position / weight).label("turn"))
+        .select_from(entities)
+        .join(Entity, Entity.id == entities.c.entity_id)
+        .join(head, true())
+        .cte("ranked")
+    )
+    return candidates.join(ranked, ranked.c.id == Post.id).order_by(
+        Post.priority.desc(), ranked.c.turn, Post.created_at
     )
 
-    result = await db.execute(stmt)
-    posts = list(result.scalars().all())
 
-    if posts:
-        post_ids = [p.id for p in posts]
-        await db.execute(update(Post).where(Post.id.in_(post_ids)).values(status=PostStatus.POSTING))
-        await db.flush()
-        for p in posts:
-            p.status = PostStatus.POSTING
+async def upcoming_scheduled(
+    db: AsyncSession, since: datetime, until: datetime, shard: tuple[int, int] | None = None
+) -> list[tuple[uuid.UUID, datetime]]:
+    # Served by ix_posts_status_scheduled. Posts overdue since before ``since`` are left to the
+    # poll claim: the ones still SCHEDULED are mostly held back by their account.
+    q = select(Post.id, Post.scheduled_for).where(
+        Post.status == PostStatus.SCHEDULED, Post.scheduled_for > since, Post.scheduled_for <= until
+    )
+    if shard is not None:
+        q = q.where(shard_clause(Post.account_id, *shard))
+    result = await db.execute(q)
+    return [(post_id, scheduled_for) for post_id, scheduled_for in result.all()]
 
-    return posts
 
+async def release_posts(db: AsyncSession, post_ids: list[uuid.UUID], lease_owner: str | None = None) -> None:
+    # Hand claimed-but-unstarted posts back to the queue, e.g. a worker's prefetch buffer on shutdown.
+    q = update(Post).where(Post.id.in_(post_ids), Post.status == PostStatus.POSTING)
+    if lease_owner is not None:
+        q = q.where(Post.lease_owner == lease_owner)
+    result = await db.execute(
+        q.values(status=PostStatus.QUEUED, lease_owner=None, lease_expires_at=None).returning(Post.id, Post.account_id)
+    )
+    for post_id, account_id in result.all():
+        ready_queue.stage(db, post_id, account_id=account_id)
+    await notify_posts(db)
 
-async def process_post(db: AsyncSession, post_id: uuid.UUID) -> None:
-    post = await db.get(Post, post_id)
-    if not post:
-        logger.warning("Post %s not found, skipping", post_id)
-        return
 
-    account = await db.get(Account, post.account_id) if post.account_id else None
+async def renew_leases(db: AsyncSession, lease_owner: str, post_ids: list[uuid.UUID]) -> int:
+    # Heartbeat for posts this worker still holds; a post whose lease already lapsed and was
+    # reclaimed elsewhere is not renewed.
+    lease_expires_at = datetime.now(timezone.utc) + timedelta(seconds=get_settings().worker_lease_seconds)
+    result = await db.execute(
+        update(Post)
+        .where(Post.id.in_(post_ids), Post.lease_owner == lease_owner, Post.status == PostStatus.POSTING)
+        .values(lease_expires_at=lease_expires_at)
+    )
+    return result.rowcount
+
+
+async def fail_exhausted_leases(db: AsyncSession) -> int:
+    """Fail POSTING posts orphaned on their last attempt, which the claim will never take back."""
+    result = await db.execute(
+        update(Post)
+        .where(
+            Post.status == PostStatus.POSTING,
+            Post.lease_expires_at < func.now(),
+            Post.retry_count >= get_settings().worker_max_retries,
+        )
+        .values(
+            status=PostStatus.FAILED,
+            error="Worker lease expired on the final attempt; the post may have been published",
+            next_retry_at=None,
+            lease_owner=None,
+            lease_expires_at=None,
+        )
+    )
+    return result.rowcount
+
+
+@dataclass
+class PublishOutcome:
+    """Result of one publish attempt, applied to the database later by ``write_outcomes``."""
+
+    post_id: uuid.UUID
+    account_id: uuid.UUID | None
+    status: PostStatus
+    retry_count: int
+    error: str | None = None
+    next_retry_at: datetime | None = None
+    platform_post_id: str | None = None
+    platform_post_url: str | None = None
+    posted_at: datetime | None = None
+    rate_limit: RateLimit | None = None
+    session: str | None = None
+    account_status: AccountStatus | None = None
+
+
+async def publish_post(post: Post, account: Account | None) -> PublishOutcome:
+    # No database access here: the worker holds no connection while the platform call is in
+    # flight, and group-commits the returned outcomes with write_outcomes().
     if not account or not account.credentials:
-        await _fail_post(db, post, "No account or credentials linked to post")
-        return
+        return _failed(post, "No account or credentials linked to post")
 
+    limiter = get_rate_limiter()
+    wait_until = limiter.acquire(post.platform, account.id)
+    if wait_until is not None:
+        return _deferred(post, wait_until, "Rate limit budget exhausted")
+
+    rate_limit: RateLimit | None = None
+    session: str | None = None
     try:
-        credentials = decrypt_credentials(account.credentials)
-        adapter = get_adapter(post.platform, credentials)
-        result = await adapter.publish(post.content, post.media_urls)
-
-        post.status = PostStatus.POSTED
-        post.platform_post_id = result.platform_post_id
-        post.platform_post_url = result.platform_post_url
-        post.posted_at = datetime.now(timezone.utc)
-        post.error = None
-        await db.flush()
+        adapter = account_adapter(account, post.platform)
+        try:
+            result = await adapter.publish(post.content, post.media_urls)
+        finally:
+            rate_limit = adapter.rate_limit
+            if rate_limit is not None:
+                limiter.record(account.id, rate_limit)
+            session = adapter.take_session_update()
+
+        outcome = PublishOutcome(
+            post_id=post.id,
+            account_id=post.account_id,
+            status=PostStatus.POSTED,
+            retry_count=post.retry_count,
+            platform_post_id=result.platform_post_id,
+            platform_post_url=result.platform_post_url,
+            posted_at=datetime.now(timezone.utc),
+        )
         logger.info("Posted %s → %s", post.id, result.platform_post_url)
 
+    except RateLimited as e:
+        outcome = _deferred(post, e.reset_at, str(e))
+
+    except AuthExpired as e:
+        logger.warning("Credentials for account %s rejected by %s: %s", account.id, post.platform, e)
+        # Back to the queue without spending a retry: the claim holds it with the account's other
+        # posts and it resumes with them once update_account puts new credentials in.
+        outcome = PublishOutcome(
+            post_id=post.id,
+            account_id=post.account_id,
+            status=PostStatus.QUEUED,
+            retry_count=post.retry_count,
+            error=str(e),
+            account_status=AccountStatus.EXPIRED,
+        )
+
+    except PermanentError as e:
+        logger.error("Post %s rejected by %s: %s", post.id, post.platform, e)
+        outcome = _failed(post, str(e), permanent=True)
+
+    except RetryableError as e:
+        logger.error("Failed to publish post %s: %s", post.id, e)
+        outcome = _failed(post, str(e), retry_after=e.retry_after)
+
     except Exception as e:
         logger.error("Failed to publish post %s: %s", post.id, e)
-        await _fail_post(db, post, str(e))
+        outcome = _failed(post, str(e))
+
+    outcome.rate_limit = rate_limit
+    outcome.session = session
+    return outcome
+
+
+async def write_outcomes(db: AsyncSession, lease_owner: str, outcomes: list[PublishOutcome]) -> None:
+    """Apply a batch of outcomes: one ``UPDATE ... FROM (VALUES ...)`` for posts, one for rate limits.
+
+    Only posts still leased to ``lease_owner`` are updated; a post whose lease lapsed and was
+    reclaimed belongs to its new owner, whose outcome wins.
+    """
+    if not outcomes:
+        return
+
+    results = values(
+        column("id", UUID(as_uuid=True)),
+        column("status", String),
+        column("error", Text),
+        column("retry_count", Integer),
+        column("next_retry_at", DateTime(timezone=True)),
+        column("platform_post_id", String),
+        column("platform_post_url", String),
+        column("posted_at", DateTime(timezone=True)),
+        name="results",
+    ).data(
+        [
+            (
+                o.post_id,
+                o.status,
+                o.error,
+                o.retry_count,
+                o.next_retry_at,
+                o.platform_post_id,
+                o.platform_post_url,
+                o.posted_at,
+            )
+            for o in outcomes
+        ]
+    )
+    # NULLs render as untyped literals; a column that is NULL in every row would otherwise be text.
+    next_retry_at = cast(results.c.next_retry_at, DateTime(timezone=True))
+    posted_at = cast(results.c.posted_at, DateTime(timezone=True))
+    result = await db.execute(
+        update(Post)
+        .where(Post.id == results.c.id, Post.lease_owner == lease_owner, Post.status == PostStatus.POSTING)
+        .values(
+            status=results.c.status,
+            error=results.c.error,
+            retry_count=results.c.retry_count,
+            next_retry_at=next_retry_at,
+            platform_post_id=func.coalesce(results.c.platform_post_id, Post.platform_post_id),
+            platform_post_url=func.coalesce(results.c.platform_post_url, Post.platform_post_url),
+            posted_at=func.coalesce(posted_at, Post.posted_at),
+            engagement_due_at=case(
+                (
+                    results.c.status == PostStatus.POSTED,
+                    # First engagement reading after the youngest tier's interval.
+                    func.now() + timedelta(seconds=get_settings().engagement_tiers[0][1]),
+                ),
+                else_=Post.engagement_due_at,
+            ),
+            lease_owner=None,
+            lease_expires_at=None,
+        )
+    )
+    if result.rowcount < len(outcomes):
+        logger.warning(
+            "Dropped %d publish results for posts no longer leased to %s", len(outcomes) - result.rowcount, lease_owner
+        )
+
+    # Latest headers win when several posts for one account finish in the same batch.
+    rate_limits = {o.account_id: o.rate_limit for o in outcomes if o.account_id and o.rate_limit}
+    if rate_limits:
+        limits = values(
+            column("id", UUID(as_uuid=True)),
+            column("remaining", Integer),
+            column("reset", DateTime(timezone=True)),
+            name="limits",
+        ).data([(account_id, rl.remaining, rl.reset_at) for account_id, rl in rate_limits.items()])
+        await db.execute(
+            update(Account)
+            .where(Account.id == limits.c.id)
+            .values(
+                rate_limit_remaining=cast(limits.c.remaining, Integer),
+                rate_limit_reset=cast(limits.c.reset, DateTime(timezone=True)),
+            )
+        )
+
+    expired = {o.account_id for o in outcomes if o.account_id and o.account_status == AccountStatus.EXPIRED}
+    if expired:
+        await db.execute(update(Account).where(Account.id.in_(expired)).values(status=AccountStatus.EXPIRED))
+
+    sessions = {o.account_id: o.session for o in outcomes if o.account_id and o.session}
+    for account_id, session in sessions.items():
+        await save_session(db, account_id, session)
+
+    for o in outcomes:
+        if o.next_retry_at is not None:
+            ready_queue.stage(db, o.post_id, o.next_retry_at, o.account_id)
+
+
+def account_adapter(account: Account, platform: Platform | None = None) -> PlatformAdapter:
+    """The adapter that talks to ``account``'s platform, or to the fake platform in shadow mode."""
+    if get_settings().worker_shadow:
+        # Keyed by account id so the mock server applies per-account rate limits and duplicate checks.
+        return get_adapter(Platform.FAKE, {"token": str(account.id)}, account.id)
+    adapter = get_adapter(platform or account.platform, decrypt_credentials(account.credentials), account.id)
+    saved_session = load_session(account)
+    if saved_session:
+        adapter.restore_session(saved_session)
+    return adapter
+
+
+def load_session(account: Account) -> str | None:
+    stored = (account.metadata_ or {}).get(SESSION_METADATA_KEY)
+    if not stored:
+        return None
+    try:
+        return decrypt_credentials(stored).get("session")
+    except Exception:
+        logger.warning("Stored session for account %s could not be decrypted, ignoring", account.id)
+        return None
+
+
+async def save_session(db: AsyncSession, account_id: uuid.UUID, session: str) -> None:
+    # Merge into metadata server-side so concurrent posts for the account don't clobber other keys.
+    stored = {SESSION_METADATA_KEY: encrypt_credentials({"session": session})}
+    await db.execute(
+        update(Account)
+        .where(Account.id == account_id)
+        .values(metadata_=func.coalesce(Account.metadata_, text("'{}'::jsonb")).op("||")(literal(stored, JSONB)))
+    )
+
+
+def _backoff(attempt: int) -> float:
+    # Decorrelated jitter: uniform between the base delay and three times the previous nominal
+    # delay, capped, so posts that failed together spread out instead of retrying in lockstep.
+    settings = get_settings()
+    base = settings.worker_retry_base_delay
+    previous = min(settings.worker_retry_max_delay, base * 2 ** (attempt - 1))
+    return min(settings.worker_retry_max_delay, random.uniform(base, previous * 3))
 
 
-async def _fail_post(db: AsyncSession, post: Post, error: str) -> None:
+def _deferred(post: Post, until: datetime, reason: str) -> PublishOutcome:
+    # Back to the queue without spending a retry; the claim ignores it until ``until``.
+    logger.info("Post %s deferred until %s: %s", post.id, until.isoformat(), reason)
+    return PublishOutcome(
+        post_id=post.id,
+        account_id=post.account_id,
+        status=PostStatus.QUEUED,
+        retry_count=post.retry_count,
+        error=reason,
+        next_retry_at=until,
+    )
+
+
+def _failed(post: Post, error: str, permanent: bool = False, retry_after: datetime | None = None) -> PublishOutcome:
     settings = get_settings()
-    post.retry_count += 1
-    post.error = error
-
-    if post.retry_count < settings.worker_max_retries:
-        delay = settings.worker_retry_base_delay * (2 ** (post.retry_count - 1))
-        post.next_retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
-        post.status = PostStatus.FAILED
-        logger.info("Post %s retry %d scheduled in %.0fs", post.id, post.retry_count, delay)
+    retry_count = post.retry_count + 1
+    next_retry_at = None
+
+    if permanent:
+        logger.warning("Post %s failed permanently: %s", post.id, error)
+    elif retry_count < settings.worker_max_retries:
+        now = datetime.now(timezone.utc)
+        # The server's Retry-After wins over our own jittered backoff.
+        next_retry_at = retry_after or now + timedelta(seconds=_backoff(retry_count))
+        logger.info("Post %s retry %d scheduled in %.0fs", post.id, retry_count, (next_retry_at - now).total_seconds())
     else:
-        post.status = PostStatus.FAILED
-        post.next_retry_at = None
-        logger.warning("Post %s permanently failed after %d retries", post.id, post.retry_count)
+        logger.warning("Post %s permanently failed after %d retries", post.id, retry_count)
 
-    await db.flush()
+    return PublishOutcome(
+        post_id=post.id,
+        account_id=post.account_id,
+        status=PostStatus.FAILED,
+        retry_count=retry_count,
+        error=error,
+        next_retry_at=next_retry_at,
+    )
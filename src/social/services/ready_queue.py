@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+
+from redis.asyncio import Redis
+from sqlalchemy import event, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from social.config import get_settings
+from social.core.enums import PostStatus
+from social.core.sharding import account_shard, configured_shards
+from social.db.models import Post
+from social.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+# Optional Redis dispatch layer in front of the posts table. Postgres stays the source of truth:
+# Redis only tells workers which ids to try, the claim still re-checks each row's status, and
+# reconcile() rebuilds both keys from the table whenever Redis state may have been lost.
+# With account sharding each worker shard gets its own pair of keys, suffixed with the shard index.
+READY_KEY = "social:posts:ready"
+DELAYED_KEY = "social:posts:delayed"
+RECONCILE_LOCK_KEY = "social:posts:reconcile"
+_PENDING = "ready_queue_pending"
+
+# Move due ids from the delayed sorted set onto the ready list in one atomic step, so two
+# workers promoting at the same moment cannot both enqueue the same id.
+_PROMOTE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+if #due > 0 then
+    redis.call('RPUSH', KEYS[1], unpack(due))
+    redis.call('ZREM', KEYS[2], unpack(due))
+end
+return #due
+"""
+
+_redis: Redis | None = None
+_pushing: set[asyncio.Task] = set()
+
+
+def enabled() -> bool:
+    return get_settings().worker_redis_queue
+
+
+def _keys(shard: int | None) -> tuple[str, str]:
+    if shard is None:
+        return READY_KEY, DELAYED_KEY
+    return f"{READY_KEY}:{shard}", f"{DELAYED_KEY}:{shard}"
+
+
+def _shard_of(account_id: uuid.UUID | None, shards: int) -> int | None:
+    return account_shard(account_id, shards) if shards > 1 else None
+
+
+def get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(get_settings().redis_url, decode_responses=True)
+    return _redis
+
+
+async def close_redis() -> None:
+    global _redis
+    if _pushing:
+        await asyncio.gather(*_pushing, return_exceptions=True)
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+def stage(
+    db: AsyncSession, post_id: uuid.UUID, due: datetime | None = None, account_id: uuid.UUID | None = None
+) -> None:
+    """Queue ``post_id`` for Redis once ``db`` commits; ``due`` in the future goes to the delayed set."""
+    if enabled():
+        shard = _shard_of(account_id, configured_shards())
+        db.sync_session.info.setdefault(_PENDING, []).append((str(post_id), due, shard))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_push(pending))
+    _pushing.add(task)
+    task.add_done_callback(_pushing.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+async def _push(pending: list[tuple[str, datetime | None, int | None]]) -> None:
+    now = datetime.now(timezone.utc)
+    ready: dict[int | None, list[str]] = {}
+    delayed: dict[int | None, dict[str, float]] = {}
+    for post_id, due, shard in pending:
+        if due is None or due <= now:
+            ready.setdefault(shard, []).append(post_id)
+        else:
+            delayed.setdefault(shard, {})[post_id] = due.timestamp()
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for shard, ids in ready.items():
+            pipe.rpush(_keys(shard)[0], *ids)
+        for shard, scores in delayed.items():
+            pipe.zadd(_keys(shard)[1], scores)
+        await pipe.execute()
+    except Exception:
+        # The reconciler will pick these up from Postgres.
+        logger.warning("Could not push %d posts to Redis", len(pending), exc_info=True)
+
+
+async def pop_ready(limit: int, shard: int | None = None) -> list[uuid.UUID]:
+    r = get_redis()
+    ready_key, delayed_key = _keys(shard)
+    await r.eval(_PROMOTE, 2, ready_key, delayed_key, time.time(), max(limit, 100))
+    ids = await r.lpop(ready_key, limit)
+    return [uuid.UUID(i) for i in ids or []]
+
+
+async def requeue(post_ids: list[uuid.UUID], shard: int | None = None, delay: float = 0.0) -> None:
+    """Return ids taken by pop_ready() that were not claimed.
+
+    Without a delay they go back to the head of the ready list in their original order; with one
+    they wait in the delayed set, so ids that cannot be claimed right now don't block the list.
+    """
+    if not post_ids:
+        return
+    ready_key, delayed_key = _keys(shard)
+    r = get_redis()
+    if delay > 0:
+        due = time.time() + delay
+        await r.zadd(delayed_key, {str(post_id): due for post_id in post_ids})
+    else:
+        await r.lpush(ready_key, *(str(post_id) for post_id in reversed(post_ids)))
+
+
+def _pending():
+    # Posts that belong in Redis: waiting to be claimed now or later, or orphaned by a lapsed lease.
+    max_retries = get_settings().worker_max_retries
+    return or_(
+        Post.status.in_([PostStatus.QUEUED, PostStatus.SCHEDULED]),
+        (Post.status == PostStatus.FAILED) & (Post.retry_count < max_retries) & Post.next_retry_at.is_not(None),
+        (Post.status == PostStatus.POSTING) & (Post.retry_count < max_retries) & (Post.lease_expires_at < func.now()),
+    )
+
+
+async def pending_ids(post_ids: list[uuid.UUID]) -> list[uuid.UUID]:
+    """The subset of ``post_ids`` that still belongs in Redis, in the given order."""
+    if not post_ids:
+        return []
+    async with async_session() as db:
+        result = await db.execute(select(Post.id).where(Post.id.in_(post_ids), _pending()))
+        pending = set(result.scalars())
+    return [post_id for post_id in post_ids if post_id in pending]
+
+
+async def reconcile(force: bool = False, shards: int = 1) -> bool:
+    """Rebuild the ready list and delayed set from Postgres; at most once per interval across workers."""
+    settings = get_settings()
+    r = get_redis()
+    interval = max(1, int(settings.worker_redis_reconcile_interval))
+    if not force and not await r.set(RECONCILE_LOCK_KEY, "1", nx=True, ex=interval):
+        return False
+
+    stmt = select(Post.id, Post.account_id, Post.status, Post.scheduled_for, Post.next_retry_at).where(_pending())
+    async with async_session() as db:
+        rows = (await db.execute(stmt)).all()
+
+    now = datetime.now(timezone.utc)
+    partitions = [None] if shards <= 1 else list(range(shards))
+    ready: dict[int | None, list[str]] = {shard: [] for shard in partitions}
+    delayed: dict[int | None, dict[str, float]] = {shard: {} for shard in partitions}
+    for post_id, account_id, status, scheduled_for, next_retry_at in rows:
+        shard = _shard_of(account_id, shards)
+        due = scheduled_for if status == PostStatus.SCHEDULED else next_retry_at
+        if due is not None and due > now:
+            delayed[shard][str(post_id)] = due.timestamp()
+        else:
+            ready[shard].append(str(post_id))
+
+    pipe = r.pipeline(transaction=True)
+    for shard in partitions:
+        ready_key, delayed_key = _keys(shard)
+        pipe.delete(ready_key, delayed_key)
+        if ready[shard]:
+            pipe.rpush(ready_key, *ready[shard])
+        if delayed[shard]:
+            pipe.zadd(delayed_key, delayed[shard])
+    await pipe.execute()
+    logger.info(
+        "Reconciled Redis queue: %d ready, %d delayed across %d shard(s)",
+        sum(map(len, ready.values())),
+        sum(map(len, delayed.values())),
+        len(partitions),
+    )
+    return True
@@ -0,0 +1,98 @@
+import logging
+import signal
+import subprocess
+import sys
+import time
+
+from social.config import get_settings
+
+logger = logging.getLogger("social.supervisor")
+
+# A child that crashes again within this many seconds of starting is restarted with a growing delay.
+_STABLE_AFTER = 60.0
+_MAX_RESTART_DELAY = 30.0
+
+
+class _Child:
+    def __init__(self, index: int, shards: int | None):
+        self.index = index
+        self.shards = shards
+        self.proc: subprocess.Popen | None = None
+        self.started_at = 0.0
+        self.restart_at = 0.0
+        self.delay = 1.0
+
+    @property
+    def args(self) -> list[str]:
+        args = [sys.executable, "-m", "social.worker", "--processes", "1"]
+        if self.shards is not None:
+            args += ["--shard", str(self.index), "--shards", str(self.shards)]
+        return args
+
+    def start(self) -> None:
+        self.proc = subprocess.Popen(self.args)
+        self.started_at = time.monotonic()
+        logger.info("Started worker %d (pid %d)", self.index, self.proc.pid)
+
+    def reap(self) -> int | None:
+        """Return the exit code if the process has exited since the last check, scheduling a restart."""
+        if self.proc is None or self.proc.poll() is None:
+            return None
+        code = self.proc.returncode
+        self.proc = None
+        now = time.monotonic()
+        self.delay = 1.0 if now - self.started_at >= _STABLE_AFTER else min(self.delay * 2, _MAX_RESTART_DELAY)
+        self.restart_at = now + self.delay
+        return code
+
+
+def run_supervisor(processes: int, shard_by_account: bool) -> int:
+    """Run ``processes`` worker children until SIGINT/SIGTERM, restarting any that exit.
+
+    With ``shard_by_account`` child ``i`` only claims posts whose account hashes to ``i``, so an
+    account's posts, sessions and adapters stay in one process.
+    """
+    settings = get_settings()
+    shards = processes if shard_by_account else None
+    if shards and settings.worker_redis_queue and shards != settings.worker_processes:
+        # The API stages Redis ids using WORKER_PROCESSES; a mismatch strands ids until reconcile.
+        logger.warning("--processes=%d differs from WORKER_PROCESSES=%d", processes, settings.worker_processes)
+
+    stopping = False
+
+    def _stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    children = [_Child(i, shards) for i in range(processes)]
+    logger.info("Supervisor started — processes=%d sharded=%s", processes, shards is not None)
+    for child in children:
+        child.start()
+
+    while not stopping:
+        time.sleep(0.5)
+        for child in children:
+            code = child.reap()
+            if code is not None and not stopping:
+                logger.warning("Worker %d exited with %d, restarting in %.0fs", child.index, code, child.delay)
+            if child.proc is None and not stopping and time.monotonic() >= child.restart_at:
+                child.start()
+
+    # Graceful drain: each child finishes in-flight posts and releases its prefetch buffer.
+    running = [child.proc for child in children if child.proc is not None]
+    logger.info("Supervisor stopping %d workers", len(running))
+    for proc in running:
+        proc.send_signal(signal.SIGTERM)
+    deadline = time.monotonic() + settings.worker_drain_timeout
+    for proc in running:
+        try:
+            proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            logger.warning("Worker pid %d did not drain in time, killing", proc.pid)
+            proc.kill()
+            proc.wait()
+    logger.info("Supervisor shutting down")
+    return 0
@@ -1,74 +1,609 @@
+import argparse
 import asyncio
+import heapq
+import itertools
 import logging
+import os
 import signal
+import socket
 import sys
+import uuid
+from collections import deque
+from collections.abc import Callable
+from datetime import datetime, timezone
 
 # Ensure adapter registration runs
 import social.platforms  # noqa: F401
-from social.config import get_settings
+from social.config import Settings, get_settings
+from social.core.encryption import credentials_cache_stats
+from social.core.metrics import LatencyStats
+from social.db.models import Account, Post
+from social.db.notify import PostListener
 from social.db.session import async_session
-from social.services.publish_service import claim_ready_posts, process_post
+from social.platforms.http import close_http_pool, open_http_pool
+from social.platforms.registry import adapter_cache_stats, close_adapters
+from social.scheduler import PrecisionScheduler
+from social.services import ready_queue
+from social.services.engagement_service import refresh_engagement, rollup_engagement
+from social.services.publish_service import (
+    PublishOutcome,
+    claim_ready_posts,
+    fail_exhausted_leases,
+    peek_ready_posts,
+    publish_post,
+    release_posts,
+    renew_leases,
+    write_outcomes,
+)
+from social.supervisor import run_supervisor
 
 logger = logging.getLogger("social.worker")
 
 
-async def run_worker() -> None:
-    settings = get_settings()
-    shutdown = asyncio.Event()
-    sem = asyncio.Semaphore(settings.worker_concurrency)
+class ResultWriter:
+    """Group-commits publish outcomes so a slow platform call never holds a pooled connection.
 
-    loop = asyncio.get_running_loop()
-    for sig in (signal.SIGINT, signal.SIGTERM):
-        loop.add_signal_handler(sig, shutdown.set)
+    Outcomes are written in one transaction once ``worker_result_batch_size`` are pending or
+    ``worker_result_flush_interval`` seconds after the first one arrived, whichever comes first.
+    """
 
-    logger.info(
-        "Worker started — poll=%.1fs batch=%d concurrency=%d retries=%d",
-        settings.worker_poll_interval,
-        settings.worker_batch_size,
-        settings.worker_concurrency,
-        settings.worker_max_retries,
-    )
+    def __init__(self, settings: Settings, lease_owner: str, on_retry: Callable[[datetime], None] | None = None):
+        self.settings = settings
+        self.lease_owner = lease_owner
+        # Told each next_retry_at once it is committed
+        self.on_retry = on_retry
+        self.pending: list[PublishOutcome] = []
+        # Loop time each pending post was claimed at, for the claim-to-commit latency by status
+        self.claimed_at: dict[uuid.UUID, float] = {}
+        self.latency = LatencyStats()
+        self._any = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
 
-    while not shutdown.is_set():
+    @property
+    def post_ids(self) -> list[uuid.UUID]:
+        return [outcome.post_id for outcome in self.pending]
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def add(self, outcome: PublishOutcome, claimed_at: float | None = None) -> None:
+        self.pending.append(outcome)
+        if claimed_at is not None:
+            self.claimed_at[outcome.post_id] = claimed_at
+        self._any.set()
+        if len(self.pending) >= self.settings.worker_result_batch_size:
+            self._full.set()
+
+    async def flush(self) -> bool:
+        batch, self.pending = self.pending, []
+        self._any.clear()
+        self._full.clear()
+        if not batch:
+            return True
         try:
             async with async_session() as db:
-                posts = await claim_ready_posts(db, settings.worker_batch_size)
-                if posts:
-                    logger.info("Claimed %d posts", len(posts))
+                await write_outcomes(db, self.lease_owner, batch)
+                await db.commit()
+        except Exception:
+            logger.exception("Failed to write %d publish results", len(batch))
+            self.pending[:0] = batch
+            self._any.set()
+            return False
+        now = asyncio.get_running_loop().time()
+        for outcome in batch:
+            if self.on_retry is not None and outcome.next_retry_at is not None:
+                self.on_retry(outcome.next_retry_at)
+            claimed_at = self.claimed_at.pop(outcome.post_id, None)
+            if claimed_at is not None:
+                self.latency.record(outcome.status, now - claimed_at)
+        return True
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        for _ in range(3):
+            if await self.flush():
+                return
+            await asyncio.sleep(1.0)
+        # Their leases lapse and they are reclaimed, so posts that did go out may be published twice.
+        logger.error("Dropped results for posts %s", [str(post_id) for post_id in self.post_ids])
+
+    async def _run(self) -> None:
+        while True:
+            await self._any.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.settings.worker_result_flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            if not await self.flush():
+                await asyncio.sleep(1.0)
+
+
+class Dispatcher:
+    """Keeps ``worker_concurrency`` publish tasks running, refilling each slot as soon as it frees up.
+
+    Claimed-but-not-started posts sit in a small prefetch buffer so a finishing task can be
+    replaced without waiting on a claim round trip. Every claimed post carries a lease in this
+    worker's name, renewed by a heartbeat while the post is buffered or in flight.
+
+    ``worker_reserved_concurrency`` slots are kept for the high-priority lane: normal posts never
+    occupy them, and when the normal lane is full the dispatcher claims only high-priority posts.
+
+    In shadow mode nothing is claimed or written: ready posts are read as they are, each one is
+    published to the fake platform once, and the fake platform's retries are replayed from memory.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        wake: asyncio.Event,
+        shutdown: asyncio.Event,
+        listener: PostListener | None = None,
+        shard: tuple[int, int] | None = None,
+    ):
+        self.settings = settings
+        self.wake = wake
+        self.shutdown = shutdown
+        self.listener = listener
+        self.shard = shard
+        self.worker_id = settings.worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        if shard is not None:
+            self.worker_id = f"{self.worker_id}#{shard[0]}"
+        self.in_flight: set[asyncio.Task] = set()
+        self.urgent: set[asyncio.Task] = set()
+        self.buffer: deque[tuple[Post, Account | None]] = deque()
+        self.processing: set[uuid.UUID] = set()
+        self.claimed_at: dict[uuid.UUID, float] = {}
+        # Scheduled posts the precision scheduler reports due, claimed by id ahead of the next batch.
+        self.due: list[uuid.UUID] = []
+        self.queue_wait = LatencyStats()
+        self.results = ResultWriter(settings, self.worker_id, self.retry_due)
+        # Loop times at which retries and deferrals this worker wrote come due (a heap)
+        self._retries: list[float] = []
+        # Shadow mode: every post read so far, and (due, seq, post, account) for pending fake retries.
+        # Both live as long as the process.
+        self.shadowed: set[uuid.UUID] = set()
+        self._shadow_retries: list[tuple[datetime, int, Post, Account | None]] = []
+        self._shadow_seq = itertools.count()
+        # Assume there is work until a claim comes back short; then wait for a wakeup or the poll.
+        self._backlog = True
+        self._urgent_backlog = True
+        self._last_claim = 0.0
+        self._last_db_claim = 0.0
+
+    @property
+    def capacity(self) -> int:
+        limit = self.settings.worker_concurrency + self.settings.worker_prefetch
+        return limit - len(self.in_flight) - len(self.buffer)
+
+    @property
+    def normal_limit(self) -> int:
+        return max(1, self.settings.worker_concurrency - self.settings.worker_reserved_concurrency)
+
+    def is_urgent(self, post: Post) -> bool:
+        return post.priority >= self.settings.worker_high_priority
+
+    def schedule_due(self, post_ids: list[uuid.UUID]) -> None:
+        self.due.extend(post_ids)
+        self.wake.set()
+
+    def retry_due(self, at: datetime) -> None:
+        delay = (at - datetime.now(timezone.utc)).total_seconds()
+        heapq.heappush(self._retries, asyncio.get_running_loop().time() + max(0.0, delay))
+
+    def _retries_passed(self, now: float) -> bool:
+        passed = False
+        while self._retries and self._retries[0] <= now:
+            heapq.heappop(self._retries)
+            passed = True
+        return passed
+
+    def _next_claim(self) -> tuple[int, int | None]:
+        """Posts to claim now and the minimum priority to claim them at, or ``(0, None)``."""
+        batch = self.settings.worker_batch_size
+        if self._backlog and self.capacity > 0:
+            return min(self.capacity, batch), None
+        # Anything still buffered is a normal post held back by the lane limit, so the free slots
+        # are reserved ones and only high-priority posts can use them.
+        free = self.settings.worker_concurrency - len(self.in_flight)
+        if self._urgent_backlog and self.capacity <= 0 and free > 0:
+            return min(free, batch), self.settings.worker_high_priority
+        return 0, None
+
+    async def run(self) -> dict[str, dict]:
+        """Dispatch until shutdown, then drain; returns the latency report since the last periodic one."""
+        loop = asyncio.get_running_loop()
+        poll = self.settings.worker_poll_interval
+        stop_waiter = asyncio.create_task(self.shutdown.wait())
+        wake_waiter: asyncio.Task | None = None
+        heartbeat = asyncio.create_task(self._heartbeat())
+        reporter = asyncio.create_task(self._report_loop())
+        self.results.start()
+
+        try:
+            while not self.shutdown.is_set():
+                if self.listener is not None and not self.listener.connected:
+                    await self.listener.start()
+
+                # The poll is only a safety net: retries come due on their own timer.
+                retried = self._retries_passed(loop.time())
+                if retried or self.wake.is_set() or loop.time() - self._last_claim >= poll:
+                    self._backlog = self._urgent_backlog = True
+
+                if self.due and self.capacity > 0:
+                    count = min(self.capacity, len(self.due))
+                    post_ids, self.due = self.due[:count], self.due[count:]
+                    self.buffer.extend(await self._claim(count, post_ids=post_ids))
+
+                want, min_priority = self._next_claim()
+                if want > 0:
+                    # Cleared before claiming so a notify that lands mid-claim triggers another pass.
+                    self.wake.clear()
+                    self._last_claim = loop.time()
+                    claimed = await self._claim(want, min_priority)
+                    self.buffer.extend(claimed)
+                    if len(claimed) < want:
+                        # Claims take the highest priority first, so any short claim means no
+                        # high-priority posts are waiting either.
+                        self._urgent_backlog = False
+                        if min_priority is None:
+                            self._backlog = False
+
+                self._fill_slots()
+
+                if self._next_claim()[0] > 0:
+                    continue
+
+                waiters: set[asyncio.Task] = {stop_waiter, *self.in_flight}
+                timeout = None
+                if not self._backlog or not self._urgent_backlog:
+                    if wake_waiter is None or wake_waiter.done():
+                        wake_waiter = asyncio.create_task(self.wake.wait())
+                    waiters.add(wake_waiter)
+                    timeout = max(0.0, poll - (loop.time() - self._last_claim))
+                    if self._retries:
+                        timeout = min(timeout, max(0.0, self._retries[0] - loop.time()))
+                await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop_waiter.cancel()
+            if wake_waiter is not None:
+                wake_waiter.cancel()
+
+        try:
+            await self.drain()
+            await self.results.close()
+        finally:
+            heartbeat.cancel()
+            reporter.cancel()
+            report = self._report()
+        return report
+
+    async def drain(self) -> None:
+        if self.buffer and self.settings.worker_shadow:
+            # Nothing was claimed, so there is nothing to hand back.
+            self.buffer.clear()
+        if self.buffer:
+            post_ids = [post.id for post, _ in self.buffer]
+            self.buffer.clear()
+            for post_id in post_ids:
+                self.claimed_at.pop(post_id, None)
+            try:
+                async with async_session() as db:
+                    await release_posts(db, post_ids, self.worker_id)
                     await db.commit()
+                logger.info("Released %d prefetched posts", len(post_ids))
+            except Exception:
+                logger.exception("Failed to release prefetched posts")
+        if self.in_flight:
+            logger.info("Waiting for %d in-flight posts", len(self.in_flight))
+            await asyncio.gather(*self.in_flight, return_exceptions=True)
+
+    async def _claim(
+        self, limit: int, min_priority: int | None = None, post_ids: list[uuid.UUID] | None = None
+    ) -> list[tuple[Post, Account | None]]:
+        if self.settings.worker_shadow:
+            return await self._shadow_claim(limit, min_priority)
+        popped: list[uuid.UUID] = []
+        # The ready list is not ordered by priority, so high-lane claims go straight to Postgres
+        # rather than popping (and skipping) normal ids.
+        if post_ids is None and min_priority is None and ready_queue.enabled():
+            try:
+                popped = await ready_queue.pop_ready(limit, self._redis_shard)
+                post_ids = popped
+            except Exception:
+                logger.warning("Redis ready queue unavailable, claiming from Postgres", exc_info=True)
+            if post_ids == []:
+                # Lapsed leases and posts whose push to Redis failed are only in Postgres; look
+                # there once per poll interval instead of waiting for the next reconcile.
+                loop = asyncio.get_running_loop()
+                if loop.time() - self._last_db_claim < self.settings.worker_poll_interval:
+                    return []
+                self._last_db_claim = loop.time()
+                post_ids = None
+        try:
+            async with async_session() as db:
+                claimed = await claim_ready_posts(
+                    db, limit, post_ids, lease_owner=self.worker_id, shard=self.shard, min_priority=min_priority
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Worker claim error")
+            await self._requeue(popped)
+            return []
+        if popped:
+            # Ids the claim skipped but that are still pending (account rate limited or awaiting
+            # new credentials) go back after a poll interval; posted, cancelled or in-flight ones are dropped.
+            taken = {post.id for post, _ in claimed}
+            skipped = [post_id for post_id in popped if post_id not in taken]
+            try:
+                skipped = await ready_queue.pending_ids(skipped)
+            except Exception:
+                logger.warning("Could not check %d skipped posts, requeueing all", len(skipped), exc_info=True)
+            await self._requeue(skipped, self.settings.worker_poll_interval)
+        if claimed:
+            logger.info("Claimed %d posts", len(claimed))
+            now = asyncio.get_running_loop().time()
+            self.claimed_at.update((post.id, now) for post, _ in claimed)
+        return claimed
+
+    async def _shadow_claim(self, limit: int, min_priority: int | None) -> list[tuple[Post, Account | None]]:
+        now = datetime.now(timezone.utc)
+        taken: list[tuple[Post, Account | None]] = []
+        while (
+            min_priority is None and self._shadow_retries and self._shadow_retries[0][0] <= now and len(taken) < limit
+        ):
+            _, _, post, account = heapq.heappop(self._shadow_retries)
+            taken.append((post, account))
+        if len(taken) < limit:
+            try:
+                async with async_session() as db:
+                    fresh = await peek_ready_posts(db, limit - len(taken), self.shadowed, self.shard, min_priority)
+            except Exception:
+                logger.exception("Worker claim error")
+                fresh = []
+            self.shadowed.update(post.id for post, _ in fresh)
+            taken.extend(fresh)
+        if taken:
+            logger.info("Shadowing %d posts", len(taken))
+            loop_now = asyncio.get_running_loop().time()
+            self.claimed_at.update((post.id, loop_now) for post, _ in taken)
+        return taken
 
-            async def _process(post_id):
-                async with sem:
-                    async with async_session() as db:
-                        try:
-                            await process_post(db, post_id)
-                            await db.commit()
-                        except Exception:
-                            await db.rollback()
-                            logger.exception("Unhandled error processing post %s", post_id)
+    def _shadow_result(self, post: Post, account: Account | None, outcome: PublishOutcome) -> None:
+        claimed_at = self.claimed_at.pop(post.id, None)
+        if claimed_at is not None:
+            self.results.latency.record(outcome.status, asyncio.get_running_loop().time() - claimed_at)
+        if outcome.next_retry_at is not None:
+            # The post object is detached, so the retry state lives on it and never reaches the row.
+            post.retry_count = outcome.retry_count
+            post.next_retry_at = outcome.next_retry_at
+            heapq.heappush(self._shadow_retries, (outcome.next_retry_at, next(self._shadow_seq), post, account))
+            self.retry_due(outcome.next_retry_at)
 
-            if posts:
-                tasks = [asyncio.create_task(_process(p.id)) for p in posts]
-                await asyncio.gather(*tasks)
+    @property
+    def _redis_shard(self) -> int | None:
+        return self.shard[0] if self.shard else None
 
+    async def _requeue(self, post_ids: list[uuid.UUID], delay: float = 0.0) -> None:
+        if not post_ids:
+            return
+        try:
+            await ready_queue.requeue(post_ids, self._redis_shard, delay)
+        except Exception:
+            # The reconciler restores them from Postgres.
+            logger.warning("Could not requeue %d posts in Redis", len(post_ids), exc_info=True)
+
+    def _fill_slots(self) -> None:
+        held: deque[tuple[Post, Account | None]] = deque()
+        while self.buffer and len(self.in_flight) < self.settings.worker_concurrency:
+            post, account = self.buffer.popleft()
+            urgent = self.is_urgent(post)
+            if not urgent and len(self.in_flight) - len(self.urgent) >= self.normal_limit:
+                held.append((post, account))
+                continue
+            task = asyncio.create_task(self._process(post, account))
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+            if urgent:
+                self.urgent.add(task)
+                task.add_done_callback(self.urgent.discard)
+        held.extend(self.buffer)
+        self.buffer = held
+
+    async def _process(self, post: Post, account: Account | None) -> None:
+        post_id = post.id
+        self.processing.add(post_id)
+        ready_at = max(t for t in (post.created_at, post.scheduled_for, post.next_retry_at) if t is not None)
+        lane = "high" if self.is_urgent(post) else "normal"
+        self.queue_wait.record(lane, (datetime.now(timezone.utc) - ready_at).total_seconds())
+        try:
+            outcome = await publish_post(post, account)
+            if self.settings.worker_shadow:
+                self._shadow_result(post, account, outcome)
+            else:
+                self.results.add(outcome, self.claimed_at.pop(post_id, None))
         except Exception:
-            logger.exception("Worker loop error")
+            logger.exception("Unhandled error processing post %s", post_id)
+        finally:
+            self.processing.discard(post_id)
+            self.claimed_at.pop(post_id, None)
+
+    async def _heartbeat(self) -> None:
+        # Runs until cancelled, including through drain() so in-flight leases don't lapse on shutdown.
+        interval = self.settings.worker_lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            if self.settings.worker_shadow:
+                continue
+            await self._fail_exhausted()
+            post_ids = [*self.processing, *(post.id for post, _ in self.buffer), *self.results.post_ids]
+            if not post_ids:
+                continue
+            try:
+                async with async_session() as db:
+                    renewed = await renew_leases(db, self.worker_id, post_ids)
+                    await db.commit()
+            except Exception:
+                logger.exception("Lease heartbeat error")
+                continue
+            if renewed < len(post_ids):
+                logger.warning("Lost lease on %d of %d posts", len(post_ids) - renewed, len(post_ids))
 
+    async def _fail_exhausted(self) -> None:
         try:
-            await asyncio.wait_for(shutdown.wait(), timeout=settings.worker_poll_interval)
+            async with async_session() as db:
+                failed = await fail_exhausted_leases(db)
+                await db.commit()
+        except Exception:
+            logger.exception("Exhausted lease sweep error")
+            return
+        if failed:
+            logger.warning("Failed %d posts whose lease lapsed on their final attempt", failed)
+
+    async def _report_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.worker_metrics_interval)
+            self._report()
+
+    def _report(self) -> dict[str, dict]:
+        report = {"queue_wait": self.queue_wait.snapshot(), "claim_to_commit": self.results.latency.snapshot()}
+        if report["queue_wait"]:
+            logger.info("Queue wait by lane (s): %s", report["queue_wait"])
+        if report["claim_to_commit"]:
+            logger.info("Claim to commit by status (s): %s", report["claim_to_commit"])
+        # Cumulative hit/miss/eviction counts, for sizing ADAPTER_CACHE_SIZE and CREDENTIALS_CACHE_SIZE.
+        logger.info("Adapter cache: %s", adapter_cache_stats())
+        logger.info("Credentials cache: %s", credentials_cache_stats())
+        return report
+
+
+async def _reconcile_loop(settings: Settings, shutdown: asyncio.Event, shards: int) -> None:
+    force = True  # rebuild once at startup in case Redis lost state while no worker was running
+    while not shutdown.is_set():
+        try:
+            await ready_queue.reconcile(force=force, shards=shards)
+            force = False
+        except Exception:
+            logger.exception("Redis reconcile error")
+        try:
+            await asyncio.wait_for(shutdown.wait(), timeout=settings.worker_redis_reconcile_interval)
         except asyncio.TimeoutError:
             pass
 
+
+async def _engagement_loop(settings: Settings, shutdown: asyncio.Event, shard: tuple[int, int] | None) -> None:
+    loop = asyncio.get_running_loop()
+    next_rollup = loop.time()
+    while not shutdown.is_set():
+        if loop.time() >= next_rollup:
+            next_rollup = loop.time() + settings.engagement_rollup_interval
+            try:
+                await rollup_engagement()
+            except Exception:
+                logger.exception("Engagement rollup error")
+        taken = 0
+        try:
+            taken = await refresh_engagement(shard)
+        except Exception:
+            logger.exception("Engagement refresh error")
+        if taken >= settings.engagement_batch_size:
+            continue  # more is due right now
+        try:
+            await asyncio.wait_for(shutdown.wait(), timeout=settings.engagement_poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_worker(shard: tuple[int, int] | None = None, shutdown: asyncio.Event | None = None) -> dict[str, dict]:
+    """Run until SIGINT/SIGTERM or ``shutdown`` is set; returns the dispatcher's final latency report."""
+    settings = get_settings()
+    shutdown = shutdown or asyncio.Event()
+    wake = asyncio.Event()
+    listener = PostListener(wake) if settings.worker_listen else None
+
+    def _stop() -> None:
+        shutdown.set()
+        wake.set()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, _stop)
+
+    logger.info(
+        "Worker started — poll=%.1fs batch=%d concurrency=%d (reserved=%d) prefetch=%d retries=%d listen=%s "
+        "lease=%.0fs shard=%s",
+        settings.worker_poll_interval,
+        settings.worker_batch_size,
+        settings.worker_concurrency,
+        settings.worker_reserved_concurrency,
+        settings.worker_prefetch,
+        settings.worker_max_retries,
+        settings.worker_listen,
+        settings.worker_lease_seconds,
+        f"{shard[0]}/{shard[1]}" if shard else "-",
+    )
+    if settings.worker_shadow:
+        logger.warning(
+            "Shadow mode: publishing to the fake platform at %s; outcomes are not written", settings.fake_platform_url
+        )
+
+    await open_http_pool()
+    reconciler = None
+    if settings.worker_redis_queue and not settings.worker_shadow:
+        reconciler = asyncio.create_task(_reconcile_loop(settings, shutdown, shard[1] if shard else 1))
+    dispatcher = Dispatcher(settings, wake, shutdown, listener, shard)
+    scheduler = None
+    if settings.worker_schedule_lookahead > 0:
+        precision = PrecisionScheduler(settings, dispatcher.schedule_due, shard)
+        if listener is not None:
+            listener.on_schedule = precision.refresh
+        scheduler = asyncio.create_task(precision.run(shutdown))
+    engagement = None
+    # Shadow engagement readings would come from the fake platform too.
+    if settings.engagement_refresh and not settings.worker_shadow:
+        engagement = asyncio.create_task(_engagement_loop(settings, shutdown, shard))
+    try:
+        report = await dispatcher.run()
+    finally:
+        if scheduler is not None:
+            scheduler.cancel()
+        if engagement is not None:
+            engagement.cancel()
+            await asyncio.gather(engagement, return_exceptions=True)
+        if reconciler is not None:
+            reconciler.cancel()
+            await ready_queue.close_redis()
+        if listener is not None:
+            await listener.close()
+        await close_adapters()
+        await close_http_pool()
     logger.info("Worker shutting down")
+    return report
 
 
 def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(prog="social-worker")
+    parser.add_argument(
+        "--processes", type=int, default=settings.worker_processes, help="worker processes to supervise"
+    )
+    # Set by the supervisor on its children.
+    parser.add_argument("--shard", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--shards", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
     logging.basicConfig(
-        level=get_settings().log_level,
+        level=settings.log_level,
         format="%(asctime)s %(levelname)-8s %(name)s — %(message)s",
     )
+    if args.shard is None and args.processes > 1:
+        sys.exit(run_supervisor(args.processes, settings.worker_shard_by_account))
+
+    shard = (args.shard, args.shards) if args.shard is not None and args.shards else None
     try:
-        asyncio.run(run_worker())
+        asyncio.run(run_worker(shard))
     except KeyboardInterrupt:
         pass
     sys.exit(0)
@@ -0,0 +1,57 @@
+import fakeredis
+import pytest
+
+from social.config import get_settings
+from social.services import ready_queue
+
+
+class FakeSession:
+    """Stands in for ``async_session()``: commits are no-ops and every query returns ``rows``."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        pass
+
+    async def execute(self, stmt):
+        rows = self.rows
+
+        class Result:
+            def all(self):
+                return rows
+
+        return Result()
+
+
+@pytest.fixture
+def settings():
+    settings = get_settings()
+    saved = settings.model_dump()
+    yield settings
+    for name, value in saved.items():
+        setattr(settings, name, value)
+
+
+@pytest.fixture
+async def redis(monkeypatch, settings):
+    settings.worker_redis_queue = True
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(ready_queue, "_redis", client)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def fake_session():
+    """Factory for :class:`FakeSession`, e.g. ``monkeypatch.setattr(module, "async_session", fake_session(rows))``."""
+    return FakeSession
@@ -0,0 +1,169 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from social import worker
+from social.services import ready_queue
+from social.services.ready_queue import DELAYED_KEY, READY_KEY
+
+
+def _dispatcher(settings) -> worker.Dispatcher:
+    return worker.Dispatcher(settings, asyncio.Event(), asyncio.Event())
+
+
+async def test_claim_requeues_skipped_ids_with_delay(redis, settings, monkeypatch, fake_session):
+    ids = [uuid.uuid4() for _ in range(3)]
+    await redis.rpush(READY_KEY, *(str(i) for i in ids))
+    seen = {}
+
+    async def claim(db, limit, post_ids, **kwargs):
+        seen["post_ids"] = post_ids
+        return [(SimpleNamespace(id=ids[0]), None)]
+
+    async def pending(post_ids):
+        return [post_id for post_id in post_ids if post_id != ids[2]]  # ids[2] was posted meanwhile
+
+    monkeypatch.setattr(worker, "async_session", fake_session())
+    monkeypatch.setattr(worker, "claim_ready_posts", claim)
+    monkeypatch.setattr(ready_queue, "pending_ids", pending)
+
+    claimed = await _dispatcher(settings)._claim(10)
+
+    assert [post.id for post, _ in claimed] == [ids[0]]
+    assert seen["post_ids"] == ids
+    assert await redis.llen(READY_KEY) == 0
+    assert await redis.zrange(DELAYED_KEY, 0, -1) == [str(ids[1])]
+
+
+async def test_claim_error_puts_ids_back_at_the_head(redis, settings, monkeypatch, fake_session):
+    ids = [uuid.uuid4() for _ in range(2)]
+    await redis.rpush(READY_KEY, *(str(i) for i in ids), "next")
+
+    async def claim(db, limit, post_ids, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(worker, "async_session", fake_session())
+    monkeypatch.setattr(worker, "claim_ready_posts", claim)
+
+    assert await _dispatcher(settings)._claim(2) == []
+    assert await redis.lrange(READY_KEY, 0, -1) == [*(str(i) for i in ids), "next"]
+
+
+async def test_empty_redis_falls_back_to_postgres_once_per_poll(redis, settings, monkeypatch, fake_session):
+    calls = []
+
+    async def claim(db, limit, post_ids, **kwargs):
+        calls.append(post_ids)
+        return []
+
+    monkeypatch.setattr(worker, "async_session", fake_session())
+    monkeypatch.setattr(worker, "claim_ready_posts", claim)
+    settings.worker_poll_interval = 60
+    dispatcher = _dispatcher(settings)
+
+    await dispatcher._claim(5)
+    await dispatcher._claim(5)
+
+    assert calls == [None]
+
+
+async def test_high_lane_claims_bypass_redis(redis, settings, monkeypatch, fake_session):
+    await redis.rpush(READY_KEY, str(uuid.uuid4()))
+    calls = []
+
+    async def claim(db, limit, post_ids, **kwargs):
+        calls.append((post_ids, kwargs["min_priority"]))
+        return []
+
+    monkeypatch.setattr(worker, "async_session", fake_session())
+    monkeypatch.setattr(worker, "claim_ready_posts", claim)
+
+    await _dispatcher(settings)._claim(5, min_priority=5)
+
+    assert calls == [(None, 5)]
+    assert await redis.llen(READY_KEY) == 1
+
+
+async def test_committed_retries_wake_the_dispatcher_before_the_poll(settings, monkeypatch, fake_session):
+    async def write(db, lease_owner, outcomes):
+        pass
+
+    monkeypatch.setattr(worker, "async_session", fake_session())
+    monkeypatch.setattr(worker, "write_outcomes", write)
+    dispatcher = _dispatcher(settings)
+    now = datetime.now(timezone.utc)
+    dispatcher.results.add(SimpleNamespace(post_id=uuid.uuid4(), status="failed", next_retry_at=now + timedelta(seconds=2)))
+    dispatcher.results.add(SimpleNamespace(post_id=uuid.uuid4(), status="posted", next_retry_at=None))
+    assert await dispatcher.results.flush()
+
+    loop_now = asyncio.get_running_loop().time()
+    assert len(dispatcher._retries) == 1
+    assert not dispatcher._retries_passed(loop_now)
+    assert dispatcher._retries_passed(loop_now + 3)
+    assert dispatcher._retries == []
+
+
+def _shadow_post(**fields) -> SimpleNamespace:
+    now = datetime.now(timezone.utc)
+    defaults = {"priority": 0, "retry_count": 0, "created_at": now, "scheduled_for": None, "next_retry_at": None}
+    return SimpleNamespace(id=uuid.uuid4(), **{**defaults, **fields})
+
+
+async def test_shadow_processes_each_post_once(settings, monkeypatch, fake_session):
+    settings.worker_shadow = True
+    posts = [_shadow_post(), _shadow_post()]
+    published = []
+
+    async def peek(db, limit, exclude, shard=None, min_priority=None):
+        return [(post, None) for post in posts if post.id not in exclude][:limit]
+
+    async def publish(post, account):
+        published.append(post.id)
+        return SimpleNamespace(post_id=post.id, status="posted", retry_count=post.retry_count, next_retry_at=None)
+
+    async def write(*args):
+        raise AssertionError("shadow mode must not write outcomes")
+
+    monkeypatch.setattr(worker, "async_session", fake_session())
+    monkeypatch.setattr(worker, "peek_ready_posts", peek)
+    monkeypatch.setattr(worker, "publish_post", publish)
+    monkeypatch.setattr(worker, "write_outcomes", write)
+    dispatcher = _dispatcher(settings)
+
+    for _ in range(3):
+        for post, account in await dispatcher._claim(10):
+            await dispatcher._process(post, account)
+
+    assert published == [post.id for post in posts]
+    assert dispatcher.results.pending == []
+
+
+async def test_shadow_replays_fake_platform_retries_in_memory(settings, monkeypatch, fake_session):
+    settings.worker_shadow = True
+    post = _shadow_post()
+    now = datetime.now(timezone.utc)
+    outcomes = [
+        SimpleNamespace(post_id=post.id, status="failed", retry_count=1, next_retry_at=now - timedelta(seconds=1)),
+        SimpleNamespace(post_id=post.id, status="posted", retry_count=1, next_retry_at=None),
+    ]
+    attempts = []
+
+    async def peek(db, limit, exclude, shard=None, min_priority=None):
+        return [] if post.id in exclude else [(post, None)]
+
+    async def publish(post, account):
+        attempts.append(post.retry_count)
+        return outcomes[len(attempts) - 1]
+
+    monkeypatch.setattr(worker, "async_session", fake_session())
+    monkeypatch.setattr(worker, "peek_ready_posts", peek)
+    monkeypatch.setattr(worker, "publish_post", publish)
+    dispatcher = _dispatcher(settings)
+
+    for _ in range(3):
+        for claimed, account in await dispatcher._claim(10):
+            await dispatcher._process(claimed, account)
+
+    assert attempts == [0, 1]
+    assert dispatcher.results.latency.snapshot().keys() == {"failed", "posted"}
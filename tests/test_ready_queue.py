@@ -0,0 +1,178 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from social.core.enums import PostStatus
+from social.core.sharding import account_shard
+from social.services import ready_queue
+from social.services.ready_queue import DELAYED_KEY, READY_KEY, RECONCILE_LOCK_KEY
+
+
+def _account_in_shard(shard: int, shards: int) -> uuid.UUID:
+    while True:
+        account_id = uuid.uuid4()
+        if account_shard(account_id, shards) == shard:
+            return account_id
+
+
+async def _pushed() -> None:
+    for task in list(ready_queue._pushing):
+        await task
+
+
+async def test_stage_pushes_after_commit(redis):
+    now = datetime.now(timezone.utc)
+    ready_id, later_id = uuid.uuid4(), uuid.uuid4()
+    db = AsyncSession()
+    ready_queue.stage(db, ready_id)
+    ready_queue.stage(db, later_id, now + timedelta(minutes=5))
+    assert await redis.llen(READY_KEY) == 0
+
+    await db.commit()
+    await _pushed()
+
+    assert await redis.lrange(READY_KEY, 0, -1) == [str(ready_id)]
+    assert await redis.zscore(DELAYED_KEY, str(later_id)) == pytest.approx((now + timedelta(minutes=5)).timestamp())
+
+
+async def test_stage_is_dropped_on_rollback(redis):
+    db = AsyncSession()
+    # Services stage inside a transaction that has already flushed the row.
+    db.sync_session.begin()
+    ready_queue.stage(db, uuid.uuid4())
+    await db.rollback()
+    await db.commit()
+    await _pushed()
+    assert await redis.llen(READY_KEY) == 0
+
+
+async def test_stage_does_nothing_when_disabled(redis, settings):
+    settings.worker_redis_queue = False
+    db = AsyncSession()
+    ready_queue.stage(db, uuid.uuid4())
+    await db.commit()
+    await _pushed()
+    assert await redis.llen(READY_KEY) == 0
+
+
+async def test_stage_routes_to_account_shard(redis, settings):
+    settings.worker_processes = 3
+    settings.worker_shard_by_account = True
+    account_id = _account_in_shard(2, 3)
+    post_id = uuid.uuid4()
+    db = AsyncSession()
+    ready_queue.stage(db, post_id, account_id=account_id)
+    await db.commit()
+    await _pushed()
+
+    assert await redis.lrange(f"{READY_KEY}:2", 0, -1) == [str(post_id)]
+    assert await redis.llen(READY_KEY) == 0
+
+
+async def test_promote_moves_only_due_ids(redis):
+    now = time.time()
+    await redis.zadd(DELAYED_KEY, {"due-1": now - 10, "due-2": now - 5, "later": now + 60})
+
+    moved = await redis.eval(ready_queue._PROMOTE, 2, READY_KEY, DELAYED_KEY, now, 100)
+
+    assert moved == 2
+    assert await redis.lrange(READY_KEY, 0, -1) == ["due-1", "due-2"]
+    assert await redis.zrange(DELAYED_KEY, 0, -1) == ["later"]
+
+
+async def test_promote_respects_limit(redis):
+    now = time.time()
+    await redis.zadd(DELAYED_KEY, {f"id-{i}": now - 10 + i for i in range(5)})
+
+    assert await redis.eval(ready_queue._PROMOTE, 2, READY_KEY, DELAYED_KEY, now, 2) == 2
+    assert await redis.lrange(READY_KEY, 0, -1) == ["id-0", "id-1"]
+    assert await redis.zcard(DELAYED_KEY) == 3
+
+
+async def test_pop_ready_promotes_then_pops_in_order(redis):
+    ids = [uuid.uuid4() for _ in range(3)]
+    await redis.rpush(READY_KEY, str(ids[0]), str(ids[1]))
+    await redis.zadd(DELAYED_KEY, {str(ids[2]): time.time() - 1})
+
+    assert await ready_queue.pop_ready(2) == ids[:2]
+    assert await ready_queue.pop_ready(10) == ids[2:]
+    assert await ready_queue.pop_ready(10) == []
+
+
+async def test_pop_ready_reads_its_shard_only(redis):
+    post_id = uuid.uuid4()
+    await redis.rpush(f"{READY_KEY}:1", str(post_id))
+
+    assert await ready_queue.pop_ready(10, shard=0) == []
+    assert await ready_queue.pop_ready(10, shard=1) == [post_id]
+
+
+async def test_requeue_returns_ids_to_the_head_in_order(redis):
+    ids = [uuid.uuid4() for _ in range(3)]
+    await redis.rpush(READY_KEY, "other")
+
+    await ready_queue.requeue(ids)
+
+    assert await redis.lrange(READY_KEY, 0, -1) == [*(str(i) for i in ids), "other"]
+
+
+async def test_requeue_with_delay_goes_to_delayed_set(redis):
+    post_id = uuid.uuid4()
+    await ready_queue.requeue([post_id], shard=1, delay=30)
+
+    assert await redis.llen(f"{READY_KEY}:1") == 0
+    score = await redis.zscore(f"{DELAYED_KEY}:1", str(post_id))
+    assert score == pytest.approx(time.time() + 30, abs=2)
+
+
+async def test_reconcile_rebuilds_ready_and_delayed(redis, monkeypatch, fake_session):
+    now = datetime.now(timezone.utc)
+    queued, scheduled, due_retry, later_retry, orphaned = (uuid.uuid4() for _ in range(5))
+    rows = [
+        (queued, None, PostStatus.QUEUED, None, None),
+        (scheduled, None, PostStatus.SCHEDULED, now + timedelta(hours=1), None),
+        (due_retry, None, PostStatus.FAILED, None, now - timedelta(seconds=1)),
+        (later_retry, None, PostStatus.FAILED, None, now + timedelta(minutes=10)),
+        (orphaned, None, PostStatus.POSTING, None, None),
+    ]
+    monkeypatch.setattr(ready_queue, "async_session", fake_session(rows))
+    await redis.rpush(READY_KEY, "stale")
+    await redis.zadd(DELAYED_KEY, {"stale": 1})
+
+    assert await ready_queue.reconcile(force=True)
+
+    assert await redis.lrange(READY_KEY, 0, -1) == [str(queued), str(due_retry), str(orphaned)]
+    assert set(await redis.zrange(DELAYED_KEY, 0, -1)) == {str(scheduled), str(later_retry)}
+
+
+async def test_reconcile_partitions_by_shard(redis, monkeypatch, fake_session):
+    shards = 2
+    first, second = _account_in_shard(0, shards), _account_in_shard(1, shards)
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    rows = [
+        (a, first, PostStatus.QUEUED, None, None),
+        (b, second, PostStatus.QUEUED, None, None),
+        (c, second, PostStatus.SCHEDULED, later, None),
+    ]
+    monkeypatch.setattr(ready_queue, "async_session", fake_session(rows))
+    await redis.rpush(f"{READY_KEY}:0", "stale")
+
+    assert await ready_queue.reconcile(force=True, shards=shards)
+
+    assert await redis.lrange(f"{READY_KEY}:0", 0, -1) == [str(a)]
+    assert await redis.lrange(f"{READY_KEY}:1", 0, -1) == [str(b)]
+    assert await redis.zrange(f"{DELAYED_KEY}:1", 0, -1) == [str(c)]
+    assert await redis.exists(READY_KEY) == 0
+
+
+async def test_reconcile_runs_once_per_interval(redis, monkeypatch, fake_session):
+    monkeypatch.setattr(ready_queue, "async_session", fake_session([]))
+
+    assert await ready_queue.reconcile()
+    assert not await ready_queue.reconcile()
+    assert await redis.ttl(RECONCILE_LOCK_KEY) > 0
+    assert await ready_queue.reconcile(force=True)